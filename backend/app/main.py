@@ -1,3 +1,6 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from db.init_db import init_db
@@ -7,15 +10,70 @@ from routes.seller import router as seller_router
 from routes.report import router as report_router
 from routes.notifications import router as notifications_router
 from routes.auth import router as auth_router
+from routes.cart import router as cart_router
+from routes.bootstrap import router as bootstrap_router
+from db.archive import archive_orders
+from db.snapshot import refresh_if_due
+from services.maintenance import cleanup_notifications, optimize_db, prune_sessions, vacuum_db
+from services.admission import AdmissionMiddleware, admission
+from services.live_kpis import live_kpis
+from services.pivot import pivot_engine
+from services.related import related_index
+from services.reservations import reservations
+from services.scheduler import MAINTENANCE_WINDOW, scheduler
+from services.write_pipeline import PIPELINE_ENABLED, order_pipeline
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+
+HOUR = 60 * 60
+
+
+def register_jobs():
+    # locais: memória de cada worker
+    scheduler.register("reservations_sweep", 30, reservations.sweep_expired, local=True)
+    scheduler.register("sessions_prune", 5 * 60, prune_sessions, local=True)
+    scheduler.register("pivot_refresh", 60, pivot_engine.refresh, run_at_start=True, local=True)
+    # o gatilho do snapshot (idade, commits contados) é do processo
+    scheduler.register("report_snapshot", 15, refresh_if_due, local=True)
+
+    # do banco: só no líder
+    scheduler.register("related_update", 60, related_index.update)
+    scheduler.register("related_rebuild", 24 * HOUR, related_index.rebuild, run_at_start=not related_index.built())
+    scheduler.register("notifications_cleanup", 6 * HOUR, cleanup_notifications)
+    scheduler.register("orders_archive", 24 * HOUR, archive_orders, window=MAINTENANCE_WINDOW)
+    scheduler.register("db_optimize", HOUR, optimize_db)
+    scheduler.register("db_vacuum", 7 * 24 * HOUR, vacuum_db, window=MAINTENANCE_WINDOW)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    live_kpis.seed()
+
+    if PIPELINE_ENABLED:
+        order_pipeline.start()
 
+    if SCHEDULER_ENABLED:
+        register_jobs()
+        scheduler.start()
+
+    yield
+
+    scheduler.stop()
+    order_pipeline.stop()
 
 
 app = FastAPI(
     title="Sistema OnMauri",
     description="Sistema de gestão da loja OnMauri",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# fila por prioridade (checkout > catálogo > relatórios); fica por dentro
+# do CORS para o 503 também sair com os cabeçalhos de CORS
+app.add_middleware(AdmissionMiddleware)
+
 # 🔥 CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,22 +85,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Staleness", "Retry-After"],
 )
 
-@app.on_event("startup")
-def on_startup():
-    init_db()
-
 app.include_router(product_router, prefix="/products", tags=["Products"])
 app.include_router(order_router, prefix="/orders", tags=["Orders"])
+app.include_router(cart_router, prefix="/carts", tags=["Carts"])
 app.include_router(seller_router, prefix="/sellers")
 
 @app.get("/health")
 def health():
     return {"status": "ok", "system": "OnMauri"}
 
+@app.get("/health/jobs")
+def health_jobs():
+    return scheduler.stats()
+
+@app.get("/health/write-pipeline")
+def health_write_pipeline():
+    return order_pipeline.stats()
+
+@app.get("/health/admission")
+def health_admission():
+    return admission.stats()
+
 app.include_router(report_router, prefix="/reports", tags=["Reports"])
 
 app.include_router(notifications_router)
 
-app.include_router(auth_router, prefix="/auth", tags=["Auth"])
\ No newline at end of file
+app.include_router(auth_router, prefix="/auth", tags=["Auth"])
+
+app.include_router(bootstrap_router)
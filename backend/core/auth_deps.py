@@ -1,14 +1,13 @@
 from fastapi import Header, HTTPException, Depends
-from sqlalchemy.orm import Session
-from db.database import get_db
-from models.user import User
 from routes.auth import SESSIONS
+from core.principals import Principal, principals
 
 
 def get_current_user(
     authorization: str = Header(None),
-    db: Session = Depends(get_db)
-):
+) -> Principal:
+    # dependência compartilhada: o FastAPI resolve uma vez por request,
+    # mesmo que a rota combine get_current_user e require_roles
 
     if not authorization:
         raise HTTPException(401, "Não autenticado")
@@ -20,14 +19,17 @@ def get_current_user(
     if not user_id:
         raise HTTPException(401, "Sessão inválida")
 
-    user = db.query(User).get(user_id)
+    user = principals.get(user_id)
+
+    if not user:
+        raise HTTPException(401, "Sessão inválida")
 
     return user
 
 
 def require_roles(*roles):
-    def checker(user: User = Depends(get_current_user)):
+    def checker(user: Principal = Depends(get_current_user)):
         if user.role not in roles:
             raise HTTPException(403, "Sem permissão")
         return user
-    return checker
\ No newline at end of file
+    return checker
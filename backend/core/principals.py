@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from db.database import SessionLocal
+from models.user import User
+
+# =====================================
+# CACHE DE PRINCIPAIS (usuário logado)
+# =====================================
+# Resolve user_id -> registro imutável do usuário uma vez e guarda num
+# LRU limitado. As rotas que alteram o usuário (troca de senha, edição e
+# desativação de vendedora, bloqueio no login) chamam invalidate().
+
+MAX_PRINCIPALS = 1024
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    name: str
+    email: str
+    role: str
+    is_active: bool
+    is_locked: bool
+    must_change_password: bool
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int = MAX_PRINCIPALS):
+        self.maxsize = maxsize
+        self._items: OrderedDict[int, Principal] = OrderedDict()
+        self._lock = threading.Lock()
+        # muda a cada invalidate: carga concorrente não grava dado velho
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Principal | None:
+        with self._lock:
+            principal = self._items.get(user_id)
+            if principal is not None:
+                self._items.move_to_end(user_id)
+                self.hits += 1
+                return principal
+            self.misses += 1
+            generation = self._generation
+
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+        finally:
+            db.close()
+
+        if not user:
+            return None
+
+        principal = Principal(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+            is_locked=bool(user.is_locked),
+            must_change_password=bool(user.must_change_password),
+        )
+
+        with self._lock:
+            if generation != self._generation:
+                return principal
+            self._items[user_id] = principal
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+        return principal
+
+    def invalidate(self, user_id: int | None):
+        if user_id is None:
+            return
+        with self._lock:
+            self._generation += 1
+            self._items.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+
+
+principals = PrincipalCache()
@@ -0,0 +1,251 @@
+import argparse
+import glob
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Column, MetaData, Table, event, text
+from sqlalchemy.orm import aliased
+
+from db.database import engine
+from models.order import Order
+from models.order_item import OrderItem
+
+# =====================================
+# ARQUIVO FRIO DE VENDAS ANTIGAS
+# =====================================
+# Vendas mais velhas que o horizonte saem de onmauri.db e vão para um
+# banco por ano (onmauri_archive_2024.db ...), anexado com ATTACH em toda
+# conexão. As views temporárias all_orders / all_order_items juntam
+# quente + arquivo (UNION ALL) e só são usadas quando o período pedido
+# alcança o histórico.
+
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "365"))
+
+_DB_PATH = engine.url.database or "onmauri.db"
+ARCHIVE_DIR = os.path.dirname(os.path.abspath(_DB_PATH))
+ARCHIVE_PREFIX = os.path.splitext(os.path.basename(_DB_PATH))[0] + "_archive_"
+
+ORDER_COLUMNS = [c.name for c in Order.__table__.columns]
+ITEM_COLUMNS = [c.name for c in OrderItem.__table__.columns]
+
+_archived_until: datetime | None = None
+_archived_until_loaded = False
+_job_lock = threading.Lock()
+
+
+def archive_path(year: int) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{ARCHIVE_PREFIX}{year}.db")
+
+
+def archive_years() -> list[int]:
+    years = []
+    pattern = re.compile(re.escape(ARCHIVE_PREFIX) + r"(\d{4})\.db$")
+    for path in glob.glob(os.path.join(ARCHIVE_DIR, ARCHIVE_PREFIX + "*.db")):
+        m = pattern.search(os.path.basename(path))
+        if m:
+            years.append(int(m.group(1)))
+    return sorted(years)
+
+
+def _schema(year: int) -> str:
+    return f"arch_{year}"
+
+
+def _attached(dbapi_conn) -> set[str]:
+    return {row[1] for row in dbapi_conn.execute("PRAGMA database_list").fetchall()}
+
+
+def _attach(dbapi_conn, year: int):
+    if _schema(year) not in _attached(dbapi_conn):
+        dbapi_conn.execute(f"ATTACH DATABASE ? AS {_schema(year)}", (archive_path(year),))
+
+
+# Em cópias do banco (snapshot de relatórios) o main é de antes de um
+# arquivamento que pode ter rodado depois; os arquivos anexados são os de
+# agora. O job move tudo abaixo do corte, então na cópia o que já estava
+# arquivado é exatamente o que é mais velho que a venda mais antiga do
+# main: o resto ainda está no main da cópia e contaria duas vezes.
+_COPY_FILTER = {
+    "orders": "WHERE created_at < {oldest}",
+    "order_items": "WHERE order_id IN (SELECT id FROM {schema}.orders WHERE created_at < {oldest})",
+}
+_OLDEST_MAIN = "coalesce((SELECT min(created_at) FROM main.orders), '9999')"
+
+
+def _create_views(dbapi_conn, years: list[int], copy: bool = False):
+    for view, table, cols in (
+        ("all_orders", "orders", ORDER_COLUMNS),
+        ("all_order_items", "order_items", ITEM_COLUMNS),
+    ):
+        col_list = ", ".join(cols)
+        parts = [f"SELECT {col_list} FROM main.{table}"]
+        for y in years:
+            part = f"SELECT {col_list} FROM {_schema(y)}.{table}"
+            if copy:
+                part += " " + _COPY_FILTER[table].format(schema=_schema(y), oldest=_OLDEST_MAIN)
+            parts.append(part)
+
+        dbapi_conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+        dbapi_conn.execute(f"CREATE TEMP VIEW {view} AS " + " UNION ALL ".join(parts))
+
+
+def attach_archives(dbapi_conn, connection_record=None):
+    years = archive_years()
+    for year in years:
+        _attach(dbapi_conn, year)
+    _create_views(dbapi_conn, years)
+
+
+def attach_archives_to_copy(dbapi_conn, connection_record=None):
+    """attach_archives para uma cópia de onmauri.db (sem contar em dobro)."""
+    years = archive_years()
+    for year in years:
+        _attach(dbapi_conn, year)
+    _create_views(dbapi_conn, years, copy=True)
+
+
+def history_views(dbapi_conn, years: list[int]):
+    """Só as views, sobre arquivos já anexados (bancos avulsos como o de db/synthetic.py)."""
+    _create_views(dbapi_conn, years)
+
+
+event.listen(engine, "connect", attach_archives)
+
+
+# =====================================
+# CONSULTAS COM HISTÓRICO
+# =====================================
+_view_meta = MetaData()
+
+_all_orders = Table(
+    "all_orders",
+    _view_meta,
+    *[Column(c.name, c.type, primary_key=c.primary_key) for c in Order.__table__.columns],
+)
+_all_order_items = Table(
+    "all_order_items",
+    _view_meta,
+    *[Column(c.name, c.type, primary_key=c.primary_key) for c in OrderItem.__table__.columns],
+)
+
+OrderHistory = aliased(Order, _all_orders, adapt_on_names=True)
+OrderItemHistory = aliased(OrderItem, _all_order_items, adapt_on_names=True)
+
+
+def archived_until() -> datetime | None:
+    """Data da venda mais recente que já está no arquivo (None = sem arquivo)."""
+    global _archived_until, _archived_until_loaded
+
+    if _archived_until_loaded:
+        return _archived_until
+
+    latest = None
+    with engine.connect() as conn:
+        for year in archive_years():
+            value = conn.execute(
+                text(f"SELECT max(created_at) FROM {_schema(year)}.orders")
+            ).scalar()
+            if value is not None:
+                value = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+                latest = value if latest is None or value > latest else latest
+
+    _archived_until = latest
+    _archived_until_loaded = True
+    return latest
+
+
+def order_entities(date_from: date):
+    """(Order, OrderItem) para o período: tabelas quentes ou views com histórico."""
+    until = archived_until()
+    if until is not None and date_from <= until.date():
+        return OrderHistory, OrderItemHistory
+    return Order, OrderItem
+
+
+# =====================================
+# JOB DE ARQUIVAMENTO
+# =====================================
+def _ensure_archive_tables(conn, year: int):
+    schema = _schema(year)
+
+    for table, cols in (("orders", ORDER_COLUMNS), ("order_items", ITEM_COLUMNS)):
+        conn.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {schema}.{table} AS SELECT * FROM main.{table} WHERE 0"
+        )
+        # colunas novas no quente (migrações) também vão pro arquivo
+        existing = {r[1] for r in conn.exec_driver_sql(f"PRAGMA {schema}.table_info({table})")}
+        for col in cols:
+            if col not in existing:
+                conn.exec_driver_sql(f"ALTER TABLE {schema}.{table} ADD COLUMN {col}")
+
+    conn.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS {schema}.ix_orders_created_at ON orders (created_at)"
+    )
+    conn.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS {schema}.ix_order_items_order_id ON order_items (order_id)"
+    )
+
+
+def archive_orders(horizon_days: int = ARCHIVE_HORIZON_DAYS) -> dict:
+    """Move vendas mais velhas que horizon_days para os bancos anuais."""
+    global _archived_until_loaded
+
+    cutoff = (datetime.now() - timedelta(days=horizon_days)).strftime("%Y-%m-%d %H:%M:%S")
+    moved = {}
+
+    with _job_lock, engine.connect() as conn:
+        years = [
+            int(r[0])
+            for r in conn.exec_driver_sql(
+                "SELECT DISTINCT strftime('%Y', created_at) FROM main.orders "
+                "WHERE created_at < ? AND created_at IS NOT NULL",
+                (cutoff,),
+            )
+        ]
+
+        for year in sorted(years):
+            # ATTACH não roda dentro de transação
+            _attach(conn.connection.dbapi_connection, year)
+            _ensure_archive_tables(conn, year)
+            conn.commit()
+
+            schema = _schema(year)
+            cond = "created_at < ? AND strftime('%Y', created_at) = ?"
+            params = (cutoff, str(year))
+            ids = f"SELECT id FROM main.orders WHERE {cond}"
+            order_cols = ", ".join(ORDER_COLUMNS)
+            item_cols = ", ".join(ITEM_COLUMNS)
+
+            # cópia + remoção na mesma transação
+            conn.exec_driver_sql(
+                f"INSERT INTO {schema}.orders ({order_cols}) "
+                f"SELECT {order_cols} FROM main.orders WHERE {cond}",
+                params,
+            )
+            conn.exec_driver_sql(
+                f"INSERT INTO {schema}.order_items ({item_cols}) "
+                f"SELECT {item_cols} FROM main.order_items WHERE order_id IN ({ids})",
+                params,
+            )
+            conn.exec_driver_sql(f"DELETE FROM main.order_items WHERE order_id IN ({ids})", params)
+            result = conn.exec_driver_sql(f"DELETE FROM main.orders WHERE {cond}", params)
+            conn.commit()
+
+            moved[year] = result.rowcount
+
+    if moved:
+        _archived_until_loaded = False
+        # conexões do pool são recriadas com os novos ATTACH / views
+        engine.dispose()
+
+    return {"cutoff": cutoff, "moved": moved}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arquiva vendas antigas em bancos anuais")
+    parser.add_argument("--days", type=int, default=ARCHIVE_HORIZON_DAYS, help="horizonte em dias")
+    args = parser.parse_args()
+
+    print(archive_orders(args.days))
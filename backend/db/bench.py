@@ -0,0 +1,844 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# =====================================
+# BENCHMARKS + VERIFICAÇÕES DE CARGA
+# =====================================
+# Cada cenário roda o app de verdade (uvicorn numa porta livre) sobre uma
+# cópia do banco num diretório temporário, mede e confere invariantes no
+# fim. Saída como a do db.synthetic check; código 1 se algo falhar.
+#
+#   python -m db.bench reservations
+#   python -m db.bench reservations --db synthetic.db --workers 32
+#   python -m db.bench auth-burst
+#   python -m db.bench archive
+#   python -m db.bench projection --rows 10000
+#   python -m db.bench pipeline --workers 16
+#   python -m db.bench pivot --tz America/Sao_Paulo
+#
+# Sem --db, gera um banco sintético pequeno (db.synthetic generate).
+# Variáveis de ambiente de configuração (SCHEDULER_ENABLED ...) são
+# definidas antes de importar o app, por isso os imports ficam dentro
+# dos cenários.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---------- infraestrutura ----------
+@contextmanager
+def _workdir(db_path: str | None, orders: int, env: dict | None = None):
+    """Diretório temporário com onmauri.db (cópia ou sintético) como cwd."""
+    os.environ.update({"SCHEDULER_ENABLED": "0", **(env or {})})
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    source = os.path.abspath(db_path) if db_path else None
+    previous = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="onmauri_bench_")
+    try:
+        os.chdir(workdir)
+        if source:
+            shutil.copy(source, "onmauri.db")
+        else:
+            from db.synthetic import generate
+
+            generate("onmauri.db", products=200, sellers=6, orders=orders,
+                     items_per_order=2.5, days=90, seed=42)
+        yield workdir
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@contextmanager
+def _serve(app):
+    """Sobe o app num uvicorn em thread; devolve a porta."""
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    # proxy_headers=False: como no deploy atrás de proxy sem
+    # --forwarded-allow-ips (o uvicorn confia em 127.0.0.1 por padrão)
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", proxy_headers=False))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("servidor não subiu")
+        time.sleep(0.02)
+    try:
+        yield port
+    finally:
+        server.should_exit = True
+        thread.join(30)
+        sock.close()
+
+
+class _Client:
+    """Cliente HTTP mínimo (keep-alive), um por thread."""
+
+    def __init__(self, port: int):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def call(self, method: str, path: str, body=None, params: dict | None = None, headers: dict | None = None):
+        if params:
+            path += "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        payload = json.dumps(body) if body is not None else None
+        self.conn.request(method, path, body=payload, headers={"Content-Type": "application/json", **(headers or {})})
+        response = self.conn.getresponse()
+        data = response.read()
+        try:
+            data = json.loads(data) if data else None
+        except ValueError:
+            pass
+        return response.status, data
+
+    def close(self):
+        self.conn.close()
+
+
+def _run_threads(n: int, target) -> list:
+    """Roda target(i) em n threads e devolve os resultados (exceções sobem)."""
+    results = [None] * n
+    errors = []
+
+    def run(i):
+        try:
+            results[i] = target(i)
+        except BaseException as e:  # repassa para a thread principal
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def _checkouts(port: int, workers: int, seconds: float | None = None, per_worker: int | None = None,
+               products: int = 50, stop: threading.Event | None = None) -> dict:
+    """Vendas simples em paralelo, por tempo ou por quantidade (itens determinísticos)."""
+
+    def worker(i):
+        rng = random.Random(1000 + i)
+        client = _Client(port)
+        ok = failed = 0
+        deadline = time.perf_counter() + seconds if seconds else None
+        try:
+            while True:
+                if per_worker is not None and ok + failed >= per_worker:
+                    break
+                if deadline and time.perf_counter() >= deadline:
+                    break
+                if stop and stop.is_set():
+                    break
+                items = [{"product_id": rng.randint(1, products), "quantity": rng.randint(1, 3)}
+                         for _ in range(rng.randint(1, 3))]
+                status, _ = client.call("POST", "/orders/", {"items": items, "payment": "pix"})
+                if status == 200:
+                    ok += 1
+                else:
+                    failed += 1
+        finally:
+            client.close()
+        return ok, failed
+
+    started = time.perf_counter()
+    results = _run_threads(workers, worker)
+    elapsed = time.perf_counter() - started
+    ok = sum(r[0] for r in results)
+    return {
+        "orders": ok,
+        "failed": sum(r[1] for r in results),
+        "seconds": round(elapsed, 2),
+        "orders_per_s": round(ok / elapsed, 1),
+    }
+
+
+def _cents(value):
+    """Arredonda floats (recursivo) para comparar totais em reais."""
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, dict):
+        return {k: _cents(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_cents(v) for v in value]
+    return value
+
+
+def _report(checks: list[tuple[str, bool, str]], metrics: dict) -> int:
+    for name, ok, detail in checks:
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<34} {detail}")
+    print(json.dumps(metrics, ensure_ascii=False))
+    return 0 if all(ok for _, ok, _ in checks) else 1
+
+
+# =====================================
+# RESERVAS: muitos carrinhos nos mesmos produtos
+# =====================================
+# Carrinhos concorrentes disputam poucos produtos com estoque baixo:
+# reservam, ajustam, finalizam, cancelam ou abandonam (expiram), e parte
+# dos checkouts corre junto com um ajuste de reserva no mesmo carrinho.
+# No fim: estoque nunca negativo, vendido = baixa de estoque,
+# products.reserved volta a 0 e um terminal que só aplica os deltas de
+# /products/changes enxerga o mesmo estoque e reservado que o banco.
+def bench_reservations(args) -> int:
+    with _workdir(args.db, args.orders):
+        from app.main import app
+        from services.reservations import reservations
+
+        hot = list(range(1, args.hot + 1))
+        con = sqlite3.connect("onmauri.db")
+        con.execute(
+            f"UPDATE products SET stock = ?, active = 1 WHERE id IN ({','.join('?' * len(hot))})",
+            (args.stock, *hot),
+        )
+        con.commit()
+        last_order = con.execute("SELECT coalesce(max(id), 0) FROM orders").fetchone()[0]
+
+        reservations.ttl = args.ttl
+        counts = {"holds": 0, "hold_rejected": 0, "checkouts": 0, "checkout_rejected": 0,
+                  "cancelled": 0, "abandoned": 0, "raced": 0}
+        lock = threading.Lock()
+
+        def bump(key):
+            with lock:
+                counts[key] += 1
+
+        def worker(i):
+            rng = random.Random(i)
+            client = _Client(port)
+            try:
+                for _ in range(args.carts):
+                    _, cart = client.call("POST", "/carts/")
+                    items = {}
+                    for pid in rng.sample(hot, rng.randint(1, len(hot))):
+                        qty = rng.randint(1, 3)
+                        status, _ = client.call("PUT", f"/carts/{cart['id']}/items",
+                                                {"product_id": pid, "quantity": qty})
+                        if status == 200:
+                            items[pid] = qty
+                            bump("holds")
+                        else:
+                            bump("hold_rejected")
+                    if items and rng.random() < 0.3:
+                        # ajuste para baixo (libera parte)
+                        pid = rng.choice(list(items))
+                        if client.call("PUT", f"/carts/{cart['id']}/items",
+                                       {"product_id": pid, "quantity": items[pid] - 1})[0] == 200:
+                            items[pid] -= 1
+
+                    action = rng.random()
+                    order = {"cart_id": cart["id"],
+                             "items": [{"product_id": p, "quantity": q} for p, q in items.items() if q]}
+                    if not order["items"] or action < 0.15:
+                        bump("abandoned")  # expira sozinho
+                    elif action < 0.3:
+                        client.call("DELETE", f"/carts/{cart['id']}")
+                        bump("cancelled")
+                    elif action < 0.45:
+                        # checkout correndo junto com um ajuste de reserva
+                        side = _Client(port)
+                        pid = rng.choice(hot)
+                        racer = threading.Thread(target=side.call, args=(
+                            "PUT", f"/carts/{cart['id']}/items", {"product_id": pid, "quantity": 2}))
+                        racer.start()
+                        status, _ = client.call("POST", "/orders/", order)
+                        racer.join()
+                        side.close()
+                        bump("raced")
+                        bump("checkouts" if status == 200 else "checkout_rejected")
+                        if status != 200:
+                            client.call("DELETE", f"/carts/{cart['id']}")
+                    else:
+                        status, _ = client.call("POST", "/orders/", order)
+                        bump("checkouts" if status == 200 else "checkout_rejected")
+                        if status != 200:
+                            client.call("DELETE", f"/carts/{cart['id']}")
+            finally:
+                client.close()
+
+        # terminal com sync incremental: só aplica /products/changes
+        catalog = {}
+        version = [0]
+
+        def sync(client):
+            while True:
+                _, page = client.call("GET", "/products/changes", params={"since": version[0]})
+                for p in page["changed"]:
+                    catalog[p["id"]] = (p["stock"], p["reserved"])
+                version[0] = page["version"]
+                if not page["has_more"]:
+                    return
+
+        with _serve(app) as port:
+            terminal = _Client(port)
+            sync(terminal)
+            stop = threading.Event()
+
+            def poll():
+                while not stop.wait(0.1):
+                    sync(terminal)
+
+            poller = threading.Thread(target=poll)
+            poller.start()
+
+            started = time.perf_counter()
+            _run_threads(args.workers, worker)
+            elapsed = time.perf_counter() - started
+
+            # abandonados: espera expirar e varre (o agendador está desligado)
+            time.sleep(args.ttl + 0.2)
+            reservations.sweep_expired()
+
+            stop.set()
+            poller.join()
+            sync(terminal)
+            terminal.close()
+
+        marks = ",".join("?" * len(hot))
+        stock = dict(con.execute(f"SELECT id, stock FROM products WHERE id IN ({marks})", hot).fetchall())
+        reserved = dict(con.execute(f"SELECT id, reserved FROM products WHERE id IN ({marks})", hot).fetchall())
+        sold = dict(con.execute(
+            f"SELECT product_id, sum(quantity) FROM order_items WHERE order_id > ? "
+            f"AND product_id IN ({marks}) GROUP BY product_id",
+            (last_order, *hot),
+        ).fetchall())
+        con.close()
+
+        checks = [
+            ("estoque nunca negativo", all(s >= 0 for s in stock.values()), str(stock)),
+            ("vendido = baixa de estoque",
+             all(sold.get(p, 0) == args.stock - stock[p] for p in hot), str(sold)),
+            ("reserved volta a 0", all(r == 0 for r in reserved.values()), str(reserved)),
+            ("terminal por delta = banco", all(catalog.get(p) == (stock[p], reserved[p]) for p in hot),
+             str({p: catalog.get(p) for p in hot})),
+        ]
+        carts = args.workers * args.carts
+        return _report(checks, {
+            **counts,
+            "carts": carts,
+            "seconds": round(elapsed, 2),
+            "carts_per_s": round(carts / elapsed, 1),
+            "holds_per_s": round(counts["holds"] / elapsed, 1),
+        })
+
+
+ATTACKER_IP = "203.0.113.9"
+CASHIER_IP = "198.51.100.7"
+
+
+def _login_attacker(port: int, index: int, step: int, accounts: int, seconds: float, rate: float) -> dict:
+    """Processo atacante: senha errada em contas alvo, `rate` tentativas/s."""
+    client = _Client(port)
+    counts = {"429": 0, "other": 0}
+    started = time.perf_counter()
+    deadline = started + seconds
+    n = index
+    sent = 0
+    try:
+        while time.perf_counter() < deadline:
+            delay = started + sent / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            sent += 1
+            status, _ = client.call("POST", "/auth/login", params={
+                "email": f"alvo{n % accounts}@onmauri.com", "password": "errada"},
+                headers={"X-Forwarded-For": ATTACKER_IP})
+            counts["429" if status == 429 else "other"] += 1
+            n += step
+    finally:
+        client.close()
+    return counts
+
+
+# =====================================
+# LOGIN: checkout durante força bruta
+# =====================================
+# Mede vendas/s com o caixa sozinho e depois com atacantes martelando
+# /auth/login (senha errada em contas que existem, cada tentativa aceita
+# custa um PBKDF2) num ritmo fixo muito acima do que o limitador deixa
+# passar (10/min por IP). Ritmo fixo porque o gerador de carga divide a
+# CPU com o servidor: sem pausa, mediria a máquina, não o 429. Tudo
+# chega pelo mesmo "proxy", então um caixa de outro IP ainda tem que
+# entrar. Roda a rajada duas vezes: com o limitador normal e com o
+# limitador aberto, para comparar. Confere que, com limitador, o
+# checkout segura o ritmo, a rajada vira 429 e os PBKDF2 ficam no
+# orçamento do balde (capacidade + recarga no período).
+def bench_auth_burst(args) -> int:
+    # como atrás do proxy: toda conexão vem do mesmo endereço (127.0.0.1)
+    # e o cliente de verdade vem no X-Forwarded-For
+    with _workdir(args.db, args.orders, {"AUTH_TRUSTED_PROXIES": "127.0.0.1"}):
+        from app.main import app
+        from core.security import hash_password
+        import routes.auth as auth_routes
+        from services.rate_limit import LIMITERS, login_ip_limiter
+
+        # contas-alvo (mesmo hash: evita gerar milhares de PBKDF2 no setup)
+        password_hash = hash_password("Correta@123")
+        con = sqlite3.connect("onmauri.db")
+        con.executemany(
+            "INSERT INTO users (name, email, password_hash, role, is_active, is_locked, "
+            "failed_attempts, must_change_password) VALUES (?, ?, ?, 'seller', 1, 0, 0, 0)",
+            [(f"Alvo {n}", f"alvo{n}@onmauri.com", password_hash) for n in range(args.accounts)]
+            + [("Caixa", "caixa@onmauri.com", password_hash)],
+        )
+        con.commit()
+        con.close()
+
+        hashes = [0]
+        original_verify = auth_routes.verify_password
+
+        def counting_verify(password, stored):
+            hashes[0] += 1
+            return original_verify(password, stored)
+
+        auth_routes.verify_password = counting_verify
+        def attack(port: int, seconds: float) -> dict:
+            # atacantes em processos separados: no mesmo processo o GIL dos
+            # clientes roubaria CPU do servidor e mediria o cliente, não o 429
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(args.attackers) as pool:
+                results = pool.starmap(
+                    _login_attacker,
+                    [(port, i, args.attackers, args.accounts, seconds, args.rate / args.attackers) for i in range(args.attackers)],
+                )
+            return {k: sum(r[k] for r in results) for k in ("429", "other")}
+
+        def burst(port: int) -> dict:
+            for limiter in LIMITERS:
+                limiter._buckets.clear()
+            hashes[0] = 0
+            attack_result = {}
+            attackers = threading.Thread(target=lambda: attack_result.update(attack(port, args.seconds)))
+            attackers.start()
+            time.sleep(1.0)  # spawn dos atacantes
+            load = _checkouts(port, args.workers, seconds=args.seconds - 1.0)
+            attackers.join()
+            return {**load, "login_429": attack_result["429"], "login_other": attack_result["other"],
+                    "pbkdf2": hashes[0]}
+
+        with _serve(app) as port:
+            _checkouts(port, args.workers, seconds=1)  # aquecimento
+            baseline = _checkouts(port, args.workers, seconds=args.seconds)
+            limited = burst(port)
+
+            # balde do atacante ainda vazio: o caixa, de outro IP, entra
+            client = _Client(port)
+            cashier_status, _ = client.call(
+                "POST", "/auth/login", params={"email": "caixa@onmauri.com", "password": "Correta@123"},
+                headers={"X-Forwarded-For": CASHIER_IP},
+            )
+            client.close()
+
+            capacity, rate = login_ip_limiter.capacity, login_ip_limiter.rate
+            login_ip_limiter.capacity, login_ip_limiter.rate = 1e9, 1e9
+            try:
+                unlimited = burst(port)
+            finally:
+                login_ip_limiter.capacity, login_ip_limiter.rate = capacity, rate
+
+        auth_routes.verify_password = original_verify
+
+        ratio = limited["orders_per_s"] / baseline["orders_per_s"] if baseline["orders_per_s"] else 0.0
+        budget = capacity + rate * (args.seconds + 1.0)  # janela dos atacantes + spawn
+        attempts = limited["login_429"] + limited["login_other"]
+        checks = [
+            (f"checkout sob rajada >= {args.min_ratio:.0%}", ratio >= args.min_ratio, f"{ratio:.0%} da linha de base"),
+            ("limitador rende mais que sem",
+             limited["orders_per_s"] > unlimited["orders_per_s"],
+             f"{limited['orders_per_s']} > {unlimited['orders_per_s']} vendas/s"),
+            ("rajada vira 429", limited["login_429"] >= 0.9 * attempts, f"{limited['login_429']}/{attempts}"),
+            ("caixa entra durante a rajada", cashier_status == 200, f"status {cashier_status} (outro IP, mesmo proxy)"),
+            ("PBKDF2 dentro do balde", limited["pbkdf2"] <= budget, f"{limited['pbkdf2']} <= {budget:.0f}"),
+        ]
+        return _report(checks, {"baseline": baseline, "limited": limited, "unlimited": unlimited})
+
+
+# =====================================
+# ARQUIVO x SNAPSHOT: totais sem contar em dobro
+# =====================================
+# O snapshot de relatórios é uma cópia do main de antes do arquivamento,
+# mas anexa os arquivos anuais de agora. Confere que /reports/summary dá
+# os mesmos totais antes do arquivamento, logo depois (snapshot velho),
+# depois de um segundo arquivamento no mesmo ano e depois do refresh.
+# Começa com um arquivo já existente, como em produção. No fim arquiva
+# tudo (inclusive o maior id) e confere que a venda seguinte recebe id
+# novo e aparece no pivô.
+def bench_archive(args) -> int:
+    env = {"SNAPSHOT_MAX_AGE_SECONDS": "3600", "SNAPSHOT_MAX_WRITES": "1000000"}
+    with _workdir(args.db, args.orders, env):
+        from app.main import app
+        from db.archive import archive_orders, attach_archives
+        from db.snapshot import refresh_snapshot, state
+
+        # arquivo já existente: o snapshot anexa o arquivo do ano ao conectar
+        initial = archive_orders(args.horizon * 3)
+
+        fields = ("revenue", "orders", "items", "revenue_today", "orders_today", "top_products", "top_sellers")
+        stages = {}
+        timings = {}
+
+        with _serve(app) as port:
+            client = _Client(port)
+
+            def summaries(stage: str):
+                started = time.perf_counter()
+                result = {}
+                for days in args.days:
+                    status, body = client.call("GET", "/reports/summary", params={"days": days})
+                    if status != 200:
+                        raise RuntimeError(f"/reports/summary {status}: {body}")
+                    # soma em float muda na última casa com a ordem das linhas
+                    result[days] = _cents({k: body[k] for k in fields})
+                stages[stage] = result
+                timings[stage] = round(time.perf_counter() - started, 3)
+
+            summaries("antes")
+            snapshot_at = state.refreshed_at
+
+            first = archive_orders(args.horizon)
+            summaries("arquivado")
+            second = archive_orders(args.horizon // 2)
+            summaries("arquivado_2x")
+            stale = state.refreshed_at == snapshot_at
+
+            refresh_snapshot()
+            summaries("refresh")
+
+            # arquiva tudo, inclusive o maior id: a próxima venda não pode
+            # reaproveitar id (o pivô e o "comprados juntos" andam por id)
+            pivot_query = {"measures": ["orders"]}
+            _, pivot_before = client.call("POST", "/reports/pivot", pivot_query)
+            everything = archive_orders(-1)
+            status, sale = client.call("POST", "/orders/", {
+                "items": [{"product_id": 1, "quantity": 1}], "payment": "pix"})
+            if status != 200:
+                raise RuntimeError(f"POST /orders/ {status}: {sale}")
+            _, pivot_after = client.call("POST", "/reports/pivot", pivot_query)
+            client.close()
+
+        con = sqlite3.connect("onmauri.db")
+        try:
+            attach_archives(con)
+            archived_max = con.execute(
+                "SELECT max(id) FROM all_orders WHERE id != ?", (sale["id"],)
+            ).fetchone()[0]
+            duplicated = con.execute(
+                "SELECT count(*) - count(DISTINCT id) FROM all_orders"
+            ).fetchone()[0]
+        finally:
+            con.close()
+
+        checks = [
+            ("arquivamento moveu vendas", bool(first["moved"]) and bool(second["moved"]),
+             f"{sum(first['moved'].values())} + {sum(second['moved'].values())}"),
+            ("snapshot velho durante o teste", stale, "sem refresh entre os arquivamentos"),
+        ]
+        for stage in ("arquivado", "arquivado_2x", "refresh"):
+            for days in args.days:
+                a, b = stages["antes"][days], stages[stage][days]
+                checks.append((f"{stage} = antes ({days}d)", a == b,
+                               f"{b['orders']} vendas / {b['revenue']:.2f}"))
+        orders_before = pivot_before["rows"][0]["orders"]
+        orders_after = pivot_after["rows"][0]["orders"]
+        checks += [
+            ("id novo depois de arquivar tudo", sale["id"] > archived_max and not duplicated,
+             f"venda {sale['id']} > arquivo {archived_max}, {duplicated} ids repetidos"),
+            ("pivô enxerga a venda nova", orders_after == orders_before + 1, f"{orders_before} -> {orders_after}"),
+        ]
+        moved = [initial["moved"], first["moved"], second["moved"], everything["moved"]]
+        return _report(checks, {"moved": moved, "seconds": timings})
+
+
+# =====================================
+# LISTAGENS: ORM + Pydantic x projeção
+# =====================================
+# O mesmo GET /orders/ pelos dois caminhos, sem HTTP no meio: objetos ORM
+# validados no response_model (como o FastAPI faz) contra fetch_rows +
+# json_rows. O JSON tem que ser idêntico; mede o melhor de --repeat.
+def bench_projection(args) -> int:
+    with _workdir(args.db, args.orders):
+        from pydantic import TypeAdapter
+
+        from db.database import SessionLocal
+        from db.projection import fetch_rows, json_rows
+        from models.order import Order
+        from routes.order import ORDER_COLUMNS
+        from schemas.order import OrderResponse
+
+        adapter = TypeAdapter(list[OrderResponse])
+
+        def orm_path(db):
+            orders = db.query(Order).order_by(Order.id.desc()).limit(args.rows).all()
+            validated = adapter.validate_python(orders, from_attributes=True)
+            return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+        def projection_path(db):
+            return json_rows(fetch_rows(db, ORDER_COLUMNS, order_by=Order.id.desc(), limit=args.rows)).body
+
+        bodies = {}
+        best = {}
+        for name, path in (("orm", orm_path), ("projection", projection_path)):
+            for _ in range(args.repeat):
+                db = SessionLocal()  # sessão nova: sem identity map de uma rodada anterior
+                try:
+                    started = time.perf_counter()
+                    bodies[name] = path(db)
+                    elapsed = time.perf_counter() - started
+                finally:
+                    db.close()
+                best[name] = min(best.get(name, elapsed), elapsed)
+
+        orm_rows, projected_rows = json.loads(bodies["orm"]), json.loads(bodies["projection"])
+        ratio = best["projection"] / best["orm"]
+        checks = [
+            ("mesmas linhas", len(projected_rows) == len(orm_rows) == args.rows, f"{len(projected_rows)} pedidos"),
+            ("JSON idêntico", projected_rows == orm_rows, ""),
+            (f"projeção <= {args.max_ratio:.0%} do ORM", ratio <= args.max_ratio,
+             f"{best['projection'] * 1000:.1f} ms x {best['orm'] * 1000:.1f} ms ({ratio:.0%})"),
+        ]
+        metrics = {name: round(seconds * 1000, 2) for name, seconds in best.items()}
+        return _report(checks, {"best_ms": metrics, "rows": args.rows})
+
+
+# =====================================
+# PIPELINE DE GRAVAÇÃO: vendas/s com e sem group commit
+# =====================================
+# Cada modo roda num processo próprio (ORDER_WRITE_PIPELINE é lido na
+# importação) sobre o mesmo banco sintético, com as mesmas vendas
+# determinísticas por caixa e estoque de sobra (nenhuma venda depende da
+# ordem de chegada). No fim compara vendas/s e confere que pedidos, itens
+# e estoque final por produto são idênticos nos dois modos, e que o
+# snapshot de relatórios contou os commits do pipeline.
+def _pipeline_run(args) -> int:
+    env = {"ORDER_WRITE_PIPELINE": args.mode, "SNAPSHOT_MAX_WRITES": "1000000000"}
+    with _workdir(args.db, args.orders, env):
+        from app.main import app
+        from db.snapshot import state
+        from services.write_pipeline import order_pipeline
+
+        con = sqlite3.connect("onmauri.db")
+        con.execute("UPDATE products SET stock = 1000000, reserved = 0, active = 1")
+        con.commit()
+        con.close()
+
+        with _serve(app) as port:
+            _checkouts(port, args.workers, per_worker=5)  # aquecimento
+            state.writes_since = 0
+            batches_before = order_pipeline.batches
+            load = _checkouts(port, args.workers, per_worker=args.per_worker)
+            writes = state.writes_since
+            batches = order_pipeline.batches - batches_before
+
+        con = sqlite3.connect("onmauri.db")
+        try:
+            orders, items = con.execute(
+                "SELECT count(*), (SELECT coalesce(sum(quantity), 0) FROM order_items) FROM orders"
+            ).fetchone()
+            stock = dict(con.execute("SELECT id, stock FROM products ORDER BY id").fetchall())
+        finally:
+            con.close()
+
+    print(json.dumps({**load, "total_orders": orders, "total_items": items, "stock": stock,
+                      "snapshot_writes": writes, "pipeline_batches": batches}))
+    return 0
+
+
+def bench_pipeline(args) -> int:
+    if args.mode is not None:
+        return _pipeline_run(args)
+
+    runs = {}
+    for mode in ("0", "1"):
+        cmd = [sys.executable, "-m", "db.bench", "pipeline", "--mode", mode, "--orders", str(args.orders),
+               "--workers", str(args.workers), "--per-worker", str(args.per_worker)]
+        if args.db:
+            cmd += ["--db", os.path.abspath(args.db)]
+        out = subprocess.run(cmd, cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+        runs[mode] = json.loads(out.strip().splitlines()[-1])
+
+    off, on = runs["0"], runs["1"]
+    expected = args.workers * args.per_worker
+    speedup = on["orders_per_s"] / off["orders_per_s"] if off["orders_per_s"] else 0.0
+    checks = [
+        ("todas as vendas gravadas", off["orders"] == on["orders"] == expected and not off["failed"] and not on["failed"],
+         f"{off['orders']} / {on['orders']} de {expected}"),
+        ("mesmos pedidos e itens", (off["total_orders"], off["total_items"]) == (on["total_orders"], on["total_items"]),
+         f"{on['total_orders']} pedidos, {on['total_items']} itens"),
+        ("mesmo estoque final", off["stock"] == on["stock"], f"{len(on['stock'])} produtos"),
+        ("snapshot conta commits do pipeline", on["pipeline_batches"] > 0 and on["snapshot_writes"] >= on["pipeline_batches"],
+         f"{on['snapshot_writes']} >= {on['pipeline_batches']} lotes"),
+    ]
+    metrics = {
+        "orders_per_s": {"pipeline_0": off["orders_per_s"], "pipeline_1": on["orders_per_s"]},
+        "speedup": round(speedup, 2),
+        "avg_batch": round(on["orders"] / on["pipeline_batches"], 2) if on["pipeline_batches"] else 0.0,
+    }
+    return _report(checks, metrics)
+
+
+# =====================================
+# PIVÔ: cortes em hora local x SQL
+# =====================================
+# Roda num fuso diferente de UTC e confere o /reports/pivot contra SQL
+# direto no created_at (UTC, convertido com 'localtime'): vendas por hora
+# e receita por dia num período, vendas feitas agora pelo POST /orders/
+# caindo na hora e no dia locais, e filtro sem nenhuma linha (200 com
+# rows vazio).
+def bench_pivot(args) -> int:
+    os.environ["TZ"] = args.tz
+    time.tzset()
+    with _workdir(args.db, args.orders):
+        from datetime import date, datetime, timedelta, timezone
+
+        from app.main import app
+
+        def utc(day: date) -> str:
+            # meia-noite local do dia, no formato do CURRENT_TIMESTAMP
+            return datetime(day.year, day.month, day.day).astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+        date_to = date.today() - timedelta(days=1)
+        date_from = date_to - timedelta(days=args.days - 1)
+        period = {"date_from": date_from.isoformat(), "date_to": date_to.isoformat()}
+        where = "o.created_at >= ? AND o.created_at < ?"
+        bounds = (utc(date_from), utc(date_to + timedelta(days=1)))
+
+        con = sqlite3.connect("onmauri.db")
+        try:
+            sql_hours = {
+                int(h): n for h, n in con.execute(
+                    f"SELECT strftime('%H', o.created_at, 'localtime'), count(*) FROM orders o "
+                    f"WHERE {where} GROUP BY 1", bounds
+                )
+            }
+            sql_days = {
+                d: round(r, 2) for d, r in con.execute(
+                    f"SELECT date(o.created_at, 'localtime'), sum(i.price * i.quantity) FROM orders o "
+                    f"JOIN order_items i ON i.order_id = o.id WHERE {where} GROUP BY 1", bounds
+                )
+            }
+            # produto só das vendas feitas agora pela API
+            fresh = con.execute("SELECT max(id) + 1 FROM products").fetchone()[0]
+            con.execute(
+                "INSERT INTO products (id, name, price, stock, reserved, active, change_seq) "
+                "VALUES (?, 'Pivô agora', 10.0, 1000, 0, 1, 0)",
+                (fresh,),
+            )
+            con.commit()
+        finally:
+            con.close()
+
+        with _serve(app) as port:
+            # erro não tratado no app derruba a conexão: conta como falha
+            probe = _Client(port)
+            try:
+                empty_status, empty = probe.call("POST", "/reports/pivot", {
+                    "dimensions": ["seller"], "filters": {"product_id": [999_999]}})
+            except (ConnectionError, http.client.HTTPException):
+                empty_status, empty = None, None
+            finally:
+                probe.close()
+
+            client = _Client(port)
+            _, hours = client.call("POST", "/reports/pivot", {
+                "dimensions": ["hour"], "measures": ["orders"], **period})
+            _, days = client.call("POST", "/reports/pivot", {
+                "dimensions": ["day"], "measures": ["revenue"], **period})
+
+            before = datetime.now()
+            for _ in range(args.live):
+                status, body = client.call("POST", "/orders/", {
+                    "items": [{"product_id": fresh, "quantity": 1}], "payment": "pix"})
+                if status != 200:
+                    raise RuntimeError(f"POST /orders/ {status}: {body}")
+            after = datetime.now()
+            today = {"date_from": before.date().isoformat(), "date_to": after.date().isoformat()}
+            _, live = client.call("POST", "/reports/pivot", {
+                "dimensions": ["day", "hour"], "measures": ["orders"],
+                "filters": {"product_id": [fresh]}, **today})
+            client.close()
+
+        pivot_hours = {r["hour"]: r["orders"] for r in hours["rows"]}
+        pivot_days = {r["day"]: r["revenue"] for r in days["rows"]}
+        expected = {(t.date().isoformat(), t.hour) for t in (before, after)}
+        live_rows = {(r["day"], r["hour"]): r["orders"] for r in live["rows"]}
+        checks = [
+            ("filtro sem linhas -> 200 vazio", empty_status == 200 and empty["rows"] == [], f"status {empty_status}"),
+            ("vendas por hora = SQL", pivot_hours == sql_hours, f"{sum(sql_hours.values())} vendas em {len(sql_hours)} horas"),
+            ("receita por dia = SQL", pivot_days == sql_days, f"{len(sql_days)} dias"),
+            ("POST /orders/ na hora local", set(live_rows) <= expected and sum(live_rows.values()) == args.live,
+             f"{live_rows} (agora {before:%Y-%m-%d %H}h)"),
+        ]
+        return _report(checks, {"tz": args.tz, "period": period, "pivot_ms": hours["elapsed_ms"]})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks e verificações de carga")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    def scenario(name, func, help_text):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--db", help="banco de partida (copiado); padrão: sintético pequeno")
+        p.add_argument("--orders", type=int, default=20_000, help="pedidos do sintético")
+        p.set_defaults(func=func)
+        return p
+
+    res = scenario("reservations", bench_reservations, "carrinhos concorrentes nos mesmos produtos")
+    res.add_argument("--workers", type=int, default=24)
+    res.add_argument("--carts", type=int, default=15, help="carrinhos por worker")
+    res.add_argument("--hot", type=int, default=3, help="produtos disputados")
+    res.add_argument("--stock", type=int, default=300, help="estoque de cada produto disputado")
+    res.add_argument("--ttl", type=float, default=2.0, help="prazo do carrinho (s)")
+
+    auth = scenario("auth-burst", bench_auth_burst, "checkout durante força bruta no login")
+    auth.add_argument("--workers", type=int, default=8, help="caixas vendendo")
+    auth.add_argument("--attackers", type=int, default=4, help="processos atacantes")
+    auth.add_argument("--rate", type=float, default=100.0, help="tentativas de login/s (total)")
+    auth.add_argument("--accounts", type=int, default=2_000, help="contas atacadas (cada uma trava em 3 erros)")
+    auth.add_argument("--seconds", type=float, default=8.0, help="duração de cada fase")
+    auth.add_argument("--min-ratio", type=float, default=0.6, help="vendas/s mínimas sob rajada (fração)")
+
+    arch = scenario("archive", bench_archive, "totais dos relatórios através de um arquivamento")
+    arch.add_argument("--horizon", type=int, default=20, help="dias do primeiro arquivamento")
+    arch.add_argument("--days", type=int, nargs="+", default=[30, 60, 90], help="períodos do /reports/summary")
+
+    proj = scenario("projection", bench_projection, "GET /orders/: ORM + Pydantic x projeção de colunas")
+    proj.add_argument("--rows", type=int, default=10_000)
+    proj.add_argument("--repeat", type=int, default=5)
+    proj.add_argument("--max-ratio", type=float, default=0.7, help="tempo máximo da projeção (fração do ORM)")
+
+    pipe = scenario("pipeline", bench_pipeline, "vendas/s com ORDER_WRITE_PIPELINE=0 x 1")
+    pipe.add_argument("--workers", type=int, default=16, help="caixas vendendo")
+    pipe.add_argument("--per-worker", type=int, default=60, help="vendas por caixa")
+    pipe.add_argument("--mode", choices=["0", "1"], help=argparse.SUPPRESS)  # processo filho
+
+    piv = scenario("pivot", bench_pivot, "/reports/pivot em hora local x SQL")
+    piv.add_argument("--tz", default="America/Sao_Paulo", help="fuso do processo (TZ)")
+    piv.add_argument("--days", type=int, default=30, help="período conferido")
+    piv.add_argument("--live", type=int, default=20, help="vendas feitas pela API durante o teste")
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
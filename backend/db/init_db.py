@@ -1,12 +1,17 @@
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
 from db.database import engine, Base, SessionLocal
+from db import archive  # noqa: F401  (ATTACH dos bancos de arquivo em cada conexão)
 
 # importa models (pra criar as tabelas)
 from models.product import Product  # noqa: F401
 from models.seller import Seller    # noqa: F401
 from models.order import Order      # noqa: F401
 from models.order_item import OrderItem  # noqa: F401
+from models.product_pair import ProductPair  # noqa: F401
+from models.product_related import ProductRelated  # noqa: F401
+from models.related_state import RelatedState  # noqa: F401
 from models.user import User  # <- precisa existir
 
 from core.security import hash_password
@@ -55,6 +60,120 @@ def seed_users():
         db.close()
 
 
+# =====================================
+# MIGRAÇÕES SIMPLES (create_all não altera tabela existente)
+# =====================================
+def _ensure_column(table: str, column: str, ddl: str):
+    cols = {c["name"] for c in inspect(engine).get_columns(table)}
+    if column in cols:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _ensure_autoincrement(table):
+    """Recria a tabela com AUTOINCREMENT (SQLite não altera PK de tabela existente)."""
+    name = table.name
+    with engine.begin() as conn:
+        ddl = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": name},
+        ).scalar()
+        if "AUTOINCREMENT" in ddl.upper():
+            return
+
+        existing = {r[1] for r in conn.execute(text(f"PRAGMA table_info({name})"))}
+        cols = ", ".join(c.name for c in table.columns if c.name in existing)
+
+        # legacy: o RENAME não reescreve as FKs de order_items para a tabela velha
+        conn.execute(text("PRAGMA legacy_alter_table = ON"))
+        for index in conn.execute(text(f"PRAGMA index_list({name})")).all():
+            if index[3] == "c":  # criado por CREATE INDEX (os nomes voltam no create)
+                conn.execute(text(f"DROP INDEX {index[1]}"))
+        conn.execute(text(f"ALTER TABLE {name} RENAME TO _{name}_old"))
+        table.create(conn)
+        conn.execute(text(f"INSERT INTO {name} ({cols}) SELECT {cols} FROM _{name}_old"))
+        conn.execute(text(f"DROP TABLE _{name}_old"))
+        conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+
+
+def _sync_sequence(name: str, view: str):
+    # o próximo id passa também do maior já arquivado
+    with engine.begin() as conn:
+        top = conn.execute(text(f"SELECT coalesce(max(id), 0) FROM {view}")).scalar()
+        updated = conn.execute(
+            text("UPDATE sqlite_sequence SET seq = :top WHERE name = :name AND seq < :top"),
+            {"name": name, "top": top},
+        ).rowcount
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_sequence WHERE name = :name"), {"name": name}
+        ).scalar()
+        if not updated and not exists:
+            conn.execute(
+                text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :top)"),
+                {"name": name, "top": top},
+            )
+
+
+def migrate():
+    _ensure_column("products", "reserved", "INTEGER NOT NULL DEFAULT 0")
+
+    # orders.seller (texto) -> orders.seller_id (FK indexada)
+    _ensure_column("orders", "seller_id", "INTEGER REFERENCES sellers (id)")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_orders_seller_id ON orders (seller_id)"
+        ))
+        # backfill: casa o texto antigo com nome ou e-mail da vendedora
+        conn.execute(text("""
+            UPDATE orders
+            SET seller_id = (
+                SELECT s.id FROM sellers s
+                WHERE lower(s.name) = lower(trim(orders.seller))
+                   OR lower(s.email) = lower(trim(orders.seller))
+                ORDER BY s.active DESC, s.id
+                LIMIT 1
+            )
+            WHERE seller_id IS NULL AND seller IS NOT NULL
+        """))
+
+    # sequência de alterações do catálogo
+    if "change_seq" not in {c["name"] for c in inspect(engine).get_columns("products")}:
+        _ensure_column("products", "change_seq", "INTEGER NOT NULL DEFAULT 0")
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE products SET change_seq = id"))
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_products_change_seq ON products (change_seq)"
+        ))
+
+    # índices das consultas quentes (relatórios por período e joins de itens)
+    with engine.begin() as conn:
+        for ddl in (
+            "CREATE INDEX IF NOT EXISTS ix_orders_created_at ON orders (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items (order_id)",
+            "CREATE INDEX IF NOT EXISTS ix_order_items_product_id ON order_items (product_id)",
+        ):
+            conn.execute(text(ddl))
+
+    # ids de venda monotônicos (o arquivo apaga os maiores ids do main)
+    _ensure_autoincrement(Order.__table__)
+    _ensure_autoincrement(OrderItem.__table__)
+    _sync_sequence("orders", "all_orders")
+    _sync_sequence("order_items", "all_order_items")
+
+    # reservas vivem em memória: ao subir o processo nenhum carrinho existe
+    # (change_seq distinto por linha: o disponível muda para os terminais)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE products SET reserved = 0, "
+            "change_seq = (SELECT max(change_seq) FROM products) + id "
+            "WHERE reserved != 0"
+        ))
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    migrate()
     seed_users()
\ No newline at end of file
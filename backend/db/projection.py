@@ -0,0 +1,50 @@
+import json
+from datetime import date, datetime
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# =====================================
+# LISTAGENS RÁPIDAS (projeção de colunas)
+# =====================================
+# Em vez de hidratar objetos ORM e validar cada um no Pydantic
+# (from_attributes), seleciona só as colunas da resposta como tuplas e
+# monta o JSON direto. O response_model continua na rota para a doc.
+
+
+def columns_for(model, schema) -> list:
+    """Colunas do model que aparecem no schema de resposta, na ordem do schema."""
+    return [getattr(model, name) for name in schema.model_fields if hasattr(model, name)]
+
+
+def select_rows(columns: list, *criteria, order_by=None, limit: int | None = None):
+    """SELECT só das colunas pedidas, com filtros / ordem / limite."""
+    stmt = select(*columns)
+    if criteria:
+        stmt = stmt.where(*criteria)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def fetch_rows(db: Session, columns: list, *criteria, order_by=None, limit: int | None = None) -> list[dict]:
+    return run_rows(db, select_rows(columns, *criteria, order_by=order_by, limit=limit))
+
+
+def run_rows(db: Session, stmt) -> list[dict]:
+    keys = list(stmt.selected_columns.keys())
+    return [dict(zip(keys, row)) for row in db.execute(stmt)]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} não serializável")
+
+
+def json_rows(rows: list[dict]) -> Response:
+    body = json.dumps(rows, default=_default, ensure_ascii=False, separators=(",", ":"))
+    return Response(content=body, media_type="application/json")
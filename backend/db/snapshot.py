@@ -0,0 +1,163 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import sessionmaker
+
+from db.archive import attach_archives_to_copy
+from db.database import engine, SessionLocal
+from services.write_pipeline import pipeline_engine
+
+# =====================================
+# SNAPSHOT DE LEITURA PARA RELATÓRIOS
+# =====================================
+# Relatórios pesados leem uma cópia de onmauri.db feita com a API de
+# backup online do SQLite, então um agregado longo não segura o lock do
+# arquivo em que o checkout grava. A cópia é refeita em background
+# quando fica velha (SNAPSHOT_MAX_AGE_SECONDS) ou depois de
+# SNAPSHOT_MAX_WRITES commits no banco principal.
+#
+# São dois arquivos alternados (_a / _b): o refresh grava no que não está
+# em uso e só então as sessões novas passam para ele. Nada é substituído
+# nem apagado com conexão aberta (no Windows o os.replace falharia), e
+# uma leitura ainda em curso no arquivo antigo só atrasa o refresh
+# seguinte (o backup espera o lock de leitura soltar).
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "60"))
+SNAPSHOT_MAX_WRITES = int(os.getenv("SNAPSHOT_MAX_WRITES", "50"))
+BACKUP_PAGES_PER_STEP = 256
+
+_DB_PATH = os.path.abspath(engine.url.database or "onmauri.db")
+SNAPSHOT_PATHS = tuple(os.path.splitext(_DB_PATH)[0] + f"_snapshot_{side}.db" for side in ("a", "b"))
+
+
+class SnapshotState:
+    def __init__(self):
+        self.path: str | None = None  # arquivo da última cópia completa
+        self.refreshed_at: float | None = None  # time.time() do último backup
+        self.writes_since = 0
+        self.refreshing = False
+        self.last_duration = 0.0
+        self.last_error: str | None = None
+        self._lock = threading.Lock()
+
+    def age(self) -> float | None:
+        if self.refreshed_at is None:
+            return None
+        return time.time() - self.refreshed_at
+
+    def is_due(self) -> bool:
+        age = self.age()
+        return (
+            age is None
+            or age >= SNAPSHOT_MAX_AGE_SECONDS
+            or self.writes_since >= SNAPSHOT_MAX_WRITES
+        )
+
+
+state = SnapshotState()
+
+
+def _connect_current():
+    return sqlite3.connect(f"file:{state.path}?mode=ro", uri=True, check_same_thread=False)
+
+
+# conexões novas sempre abrem o arquivo atual; dispose() após a troca
+# fecha as ociosas que ainda apontam para o outro
+snapshot_engine = create_engine("sqlite://", creator=_connect_current, poolclass=QueuePool)
+event.listen(snapshot_engine, "connect", attach_archives_to_copy)
+
+SnapshotSession = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=snapshot_engine,
+)
+
+
+def _count_write(conn):
+    state.writes_since += 1
+
+
+# vendas com ORDER_WRITE_PIPELINE=1 commitam pelo engine do pipeline
+event.listen(engine, "commit", _count_write)
+event.listen(pipeline_engine, "commit", _count_write)
+
+
+def refresh_snapshot() -> bool:
+    """Copia o banco principal para o snapshot. Retorna False se outro refresh já roda."""
+    with state._lock:
+        if state.refreshing:
+            return False
+        state.refreshing = True
+
+    started = time.time()
+    target = SNAPSHOT_PATHS[1] if state.path == SNAPSHOT_PATHS[0] else SNAPSHOT_PATHS[0]
+    writes_before = state.writes_since
+
+    try:
+        src = engine.raw_connection()
+        try:
+            dst = sqlite3.connect(target)
+            try:
+                # em passos: entre um passo e outro o checkout consegue gravar;
+                # leitura atrasada no alvo (BUSY) só faz o backup esperar
+                src.driver_connection.backup(dst, pages=BACKUP_PAGES_PER_STEP, sleep=0.001)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+
+        # sessões novas passam a ler o alvo; as em curso terminam no outro
+        # arquivo e suas conexões são descartadas ao voltar para o pool
+        state.path = target
+        snapshot_engine.dispose()
+
+        state.refreshed_at = started
+        state.writes_since = max(0, state.writes_since - writes_before)
+        state.last_error = None
+        return True
+
+    except Exception as e:
+        state.last_error = str(e)
+        logger.exception("falha ao atualizar snapshot de relatórios")
+        return False
+
+    finally:
+        state.last_duration = time.time() - started
+        with state._lock:
+            state.refreshing = False
+
+
+def refresh_if_due():
+    if state.is_due():
+        refresh_snapshot()
+
+
+def get_report_db(response: Response):
+    """Dependência das rotas de relatório: sessão no snapshot + header de atraso."""
+    if state.refreshed_at is None:
+        refresh_if_due()
+    elif state.is_due():
+        threading.Thread(target=refresh_snapshot, daemon=True).start()
+
+    age = state.age()
+
+    if age is None:
+        # snapshot indisponível: cai para o banco principal
+        db = SessionLocal()
+        response.headers["X-Data-Staleness"] = "0"
+    else:
+        db = SnapshotSession()
+        response.headers["X-Data-Staleness"] = f"{age:.1f}"
+
+    try:
+        yield db
+    finally:
+        db.close()
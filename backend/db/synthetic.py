@@ -0,0 +1,376 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event, text
+
+from db.database import Base
+
+# importa models (pra create_all conhecer todas as tabelas)
+from models.product import Product  # noqa: F401
+from models.seller import Seller  # noqa: F401
+from models.order import Order  # noqa: F401
+from models.order_item import OrderItem  # noqa: F401
+from models.user import User  # noqa: F401
+from models.notification import Notification  # noqa: F401
+from models.stock_audit import StockAudit  # noqa: F401
+
+# =====================================
+# DADOS SINTÉTICOS + REGRESSÃO DE PLANOS
+# =====================================
+# generate: cria um banco com o schema real e enche de vendas com
+#   distribuição realista (poucos produtos/vendedoras concentram as
+#   vendas, pico de horário, fim de semana mais forte). Mesmo --seed,
+#   mesmo banco.
+# check: roda as consultas quentes das rotas (os próprios statements) com
+#   EXPLAIN QUERY PLAN, confere se usam os índices esperados e mede o
+#   tempo de cada uma.
+#
+#   python -m db.synthetic generate --db synthetic.db --orders 1000000
+#   python -m db.synthetic check --db synthetic.db --out timings.json
+
+BATCH = 20_000
+PAYMENTS = [("pix", 45), ("credito", 30), ("debito", 15), ("dinheiro", 10)]
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 0, 1, 3, 6, 8, 9, 8, 7, 8, 9, 10, 9, 6, 3, 1, 0, 0]
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.2, 1.6, 0.7]  # seg..dom
+
+
+def _zipf_weights(n: int, s: float) -> list[float]:
+    return [1.0 / ((rank + 1) ** s) for rank in range(n)]
+
+
+def _cumulative(weights: list[float]) -> list[float]:
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+def _create_schema(path: str):
+    eng = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=eng)
+    eng.dispose()
+
+
+def _secondary_indexes(conn: sqlite3.Connection, tables: tuple[str, ...]) -> list[tuple[str, str]]:
+    marks = ",".join("?" * len(tables))
+    return conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+        f"AND sql IS NOT NULL AND tbl_name IN ({marks}) ORDER BY name",
+        tables,
+    ).fetchall()
+
+
+def generate(
+    path: str,
+    products: int,
+    sellers: int,
+    orders: int,
+    items_per_order: float,
+    days: int,
+    seed: int,
+    end: datetime | None = None,
+) -> dict:
+    rng = random.Random(seed)
+    _create_schema(path)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    started = time.perf_counter()
+
+    # índices secundários saem durante a carga e voltam no fim
+    indexes = _secondary_indexes(conn, ("orders", "order_items", "products"))
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    base_product = conn.execute("SELECT coalesce(max(id), 0) FROM products").fetchone()[0]
+    base_seller = conn.execute("SELECT coalesce(max(id), 0) FROM sellers").fetchone()[0]
+    next_order = conn.execute("SELECT coalesce(max(id), 0) FROM orders").fetchone()[0] + 1
+    next_item = conn.execute("SELECT coalesce(max(id), 0) FROM order_items").fetchone()[0] + 1
+
+    # catálogo: preços log-normais, estoque alto pra não travar nada
+    product_rows = []
+    prices = []
+    for i in range(products):
+        pid = base_product + i + 1
+        price = round(min(max(rng.lognormvariate(4.0, 0.7), 5.0), 2000.0), 2)
+        prices.append(price)
+        product_rows.append((pid, f"Produto {pid}", None, price, 1_000_000, 0, True, pid))
+    conn.executemany(
+        "INSERT INTO products (id, name, description, price, stock, reserved, active, change_seq) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        product_rows,
+    )
+
+    seller_rows = [
+        (base_seller + i + 1, f"Vendedora {base_seller + i + 1}", f"synthetic{base_seller + i + 1}@onmauri.com", True)
+        for i in range(sellers)
+    ]
+    conn.executemany("INSERT INTO sellers (id, name, email, active) VALUES (?, ?, ?, ?)", seller_rows)
+
+    product_cum = _cumulative(_zipf_weights(products, 1.1))
+    seller_cum = _cumulative(_zipf_weights(sellers, 0.8))
+    payment_names = [p for p, _ in PAYMENTS]
+    payment_cum = _cumulative([w for _, w in PAYMENTS])
+    hour_cum = _cumulative(HOUR_WEIGHTS)
+
+    # dias mais pesados no fim de semana; o mais recente é `end` (hoje)
+    today = (end or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    day_list = [today - timedelta(days=d) for d in range(days)]
+    day_cum = _cumulative([WEEKDAY_WEIGHTS[d.weekday()] for d in day_list])
+
+    # itens por pedido: 1 + geométrica com média items_per_order
+    p_more = 1.0 - 1.0 / max(items_per_order, 1.0)
+
+    order_batch, item_batch = [], []
+    item_count = 0
+
+    def flush():
+        conn.executemany(
+            "INSERT INTO orders (id, total, seller_id, seller, payment, discount_type, "
+            "discount_value, note, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            order_batch,
+        )
+        conn.executemany(
+            "INSERT INTO order_items (id, order_id, product_id, quantity, price) VALUES (?, ?, ?, ?, ?)",
+            item_batch,
+        )
+        order_batch.clear()
+        item_batch.clear()
+
+    for _ in range(orders):
+        oid = next_order
+        next_order += 1
+
+        n_items = 1
+        while rng.random() < p_more:
+            n_items += 1
+
+        subtotal = 0.0
+        for pidx in rng.choices(range(products), cum_weights=product_cum, k=n_items):
+            qty = 1 if rng.random() < 0.75 else rng.randint(2, 4)
+            price = prices[pidx]
+            subtotal += price * qty
+            item_batch.append((next_item, oid, base_product + pidx + 1, qty, price))
+            next_item += 1
+            item_count += 1
+
+        discount_type, discount_value, total = "none", 0.0, subtotal
+        if rng.random() < 0.1:
+            discount_type, discount_value = "percent", float(rng.choice([5, 10, 15]))
+            total = subtotal * (1 - discount_value / 100.0)
+
+        sidx = rng.choices(range(sellers), cum_weights=seller_cum)[0] if sellers else None
+        seller_id = base_seller + sidx + 1 if sidx is not None else None
+        seller_name = f"Vendedora {seller_id}" if seller_id else None
+
+        day = rng.choices(day_list, cum_weights=day_cum)[0]
+        hour = rng.choices(range(24), cum_weights=hour_cum)[0]
+        created_at = day + timedelta(hours=hour, minutes=rng.randrange(60), seconds=rng.randrange(60))
+        # horário sorteado em hora local; gravado em UTC, como o CURRENT_TIMESTAMP das vendas reais
+        created_at = created_at.astimezone(timezone.utc)
+
+        order_batch.append((
+            oid,
+            round(total, 2),
+            seller_id,
+            seller_name,
+            rng.choices(payment_names, cum_weights=payment_cum)[0],
+            discount_type,
+            discount_value,
+            None,
+            created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+
+        if len(order_batch) >= BATCH:
+            flush()
+
+    if order_batch:
+        flush()
+
+    for _, sql in indexes:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    return {
+        "db": path,
+        "products": products,
+        "sellers": sellers,
+        "orders": orders,
+        "items": item_count,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+# =====================================
+# CONSULTAS QUENTES (as mesmas das rotas)
+# =====================================
+# Os statements vêm dos próprios builders das rotas e são compilados pelo
+# SQLAlchemy: mudou a rota, mudou o que é conferido aqui.
+# (nome, statement, índices que o plano precisa citar, trechos proibidos)
+def hot_queries(days: int = 30, first_id: int = 0) -> list[tuple]:
+    # rotas só quando o check roda (generate não precisa do app)
+    from db.archive import OrderHistory, OrderItemHistory
+    from routes.order import orders_query, product_for_sale_query, take_stock_stmt
+    from routes.product import changes_query
+    from routes.report import _start_of_today, period_orders_query, summary_queries
+
+    # mesmo período que /reports/summary?days=N
+    date_from = date.today() - timedelta(days=days - 1)
+    start = datetime(date_from.year, date_from.month, date_from.day)
+
+    queries = []
+    # quente = tabelas do main; history = views all_orders / all_order_items
+    # (order_entities troca para elas quando o período alcança o arquivo)
+    for suffix, O, I in (("", Order, OrderItem), ("_history", OrderHistory, OrderItemHistory)):
+        q = summary_queries(O, I, start, first_id, _start_of_today(), 5, 10)
+        queries += [
+            (f"report_orders{suffix}", period_orders_query(O, start), ["ix_orders_created_at"], []),
+            (f"report_revenue{suffix}", q["revenue"], ["ix_orders_created_at"], []),
+            # sem materializar a view de itens inteira
+            (f"report_items{suffix}", q["items"], ["ix_orders_created_at", "ix_order_items_order_id"], ["SCAN main.order_items"]),
+            (f"report_top_products{suffix}", q["top_products"], ["ix_orders_created_at", "ix_order_items_order_id"], ["SCAN main.order_items"]),
+            (f"report_top_sellers{suffix}", q["top_sellers"], ["ix_orders_created_at"], []),
+        ]
+
+    queries += [
+        ("report_revenue_today", q["revenue_today"], ["ix_orders_created_at"], []),
+        ("report_orders_today", q["orders_today"], ["ix_orders_created_at"], []),
+        ("report_recent_orders", q["recent_orders"], ["ix_orders_created_at"], ["USE TEMP B-TREE"]),
+        ("list_orders", orders_query(), [], ["USE TEMP B-TREE"]),
+        ("list_orders_by_seller", orders_query(1), ["ix_orders_seller_id"], []),
+        ("checkout_product_lookup", product_for_sale_query(1), ["INTEGER PRIMARY KEY"], []),
+        # baixa condicional + change_seq = max + 1 (subconsulta no índice)
+        ("checkout_take_stock", take_stock_stmt(1, 1, 0), ["INTEGER PRIMARY KEY", "ix_products_change_seq"], []),
+        ("catalog_changes", changes_query(0, 1000), ["ix_products_change_seq"], ["USE TEMP B-TREE"]),
+    ]
+    return queries
+
+
+def _explain(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("explain"):
+        statement = "EXPLAIN QUERY PLAN " + statement
+    return statement, parameters
+
+
+def _empty_archive(dbapi_conn, connection_record=None):
+    from db.archive import history_views
+
+    # um arquivo vazio anexado: as views viram UNION ALL como em produção
+    dbapi_conn.execute("ATTACH DATABASE ':memory:' AS arch_0")
+    for table in ("orders", "order_items"):
+        dbapi_conn.execute(f"CREATE TABLE arch_0.{table} AS SELECT * FROM main.{table} WHERE 0")
+    dbapi_conn.execute("CREATE INDEX arch_0.ix_orders_created_at ON orders (created_at)")
+    dbapi_conn.execute("CREATE INDEX arch_0.ix_order_items_order_id ON order_items (order_id)")
+    history_views(dbapi_conn, [0])
+
+
+def check(path: str, repeat: int = 5, days: int = 30) -> tuple[bool, list[dict]]:
+    check_engine = create_engine(f"sqlite:///{path}")
+    event.listen(check_engine, "connect", _empty_archive)
+    # o mesmo SQL compilado, com os mesmos parâmetros, vira EXPLAIN QUERY PLAN
+    event.listen(check_engine, "before_cursor_execute", _explain, retval=True)
+
+    ok = True
+    results = []
+
+    # tudo numa transação desfeita no fim: a baixa de estoque também é medida
+    with check_engine.connect() as conn:
+        first_id = conn.execute(text(
+            "SELECT min(id) FROM orders WHERE created_at >= date('now', 'localtime', :back)"
+        ), {"back": f"-{days - 1} days"}).scalar()
+
+        for name, stmt, must_use, must_not in hot_queries(days, first_id or 0):
+            conn.info["explain"] = True
+            try:
+                plan = " | ".join(row[-1] for row in conn.execute(stmt))
+            finally:
+                conn.info["explain"] = False
+
+            problems = [f"não usa {idx}" for idx in must_use if idx not in plan]
+            problems += [f"plano contém {bad}" for bad in must_not if bad in plan]
+
+            timings = []
+            for _ in range(repeat):
+                t = time.perf_counter()
+                result = conn.execute(stmt)
+                if result.returns_rows:
+                    result.all()
+                timings.append((time.perf_counter() - t) * 1000)
+
+            ok = ok and not problems
+            results.append({
+                "query": name,
+                "ok": not problems,
+                "problems": problems,
+                "plan": plan,
+                "median_ms": round(statistics.median(timings), 3),
+                "max_ms": round(max(timings), 3),
+            })
+
+        conn.rollback()
+
+    check_engine.dispose()
+    return ok, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dados sintéticos e regressão de planos de consulta")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    gen = sub.add_parser("generate", help="gera um banco sintético")
+    gen.add_argument("--db", default="synthetic.db")
+    gen.add_argument("--products", type=int, default=2_000)
+    gen.add_argument("--sellers", type=int, default=12)
+    gen.add_argument("--orders", type=int, default=100_000)
+    gen.add_argument("--items", type=float, default=2.5, help="média de itens por pedido")
+    gen.add_argument("--days", type=int, default=365, help="espalhamento das datas")
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--end", type=datetime.fromisoformat, help="último dia (AAAA-MM-DD); padrão hoje")
+    gen.add_argument("--force", action="store_true", help="apaga o arquivo se já existir")
+
+    chk = sub.add_parser("check", help="confere planos (EXPLAIN QUERY PLAN) e mede as consultas quentes")
+    chk.add_argument("--db", default="synthetic.db")
+    chk.add_argument("--repeat", type=int, default=5)
+    chk.add_argument("--days", type=int, default=30, help="período dos relatórios")
+    chk.add_argument("--out", help="grava os tempos em JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "generate":
+        if os.path.exists(args.db):
+            if not args.force:
+                parser.error(f"{args.db} já existe (use --force)")
+            os.remove(args.db)
+        print(json.dumps(generate(
+            args.db, args.products, args.sellers, args.orders, args.items, args.days, args.seed, args.end,
+        )))
+        return 0
+
+    ok, results = check(args.db, args.repeat, args.days)
+    for r in results:
+        status = "ok  " if r["ok"] else "FAIL"
+        print(f"{status} {r['query']:<26} {r['median_ms']:>9.3f} ms  {r['plan']}")
+        for problem in r["problems"]:
+            print(f"     -> {problem}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, ensure_ascii=False, indent=2)
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Float, DateTime, String
+from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey
 from sqlalchemy.sql import func
 from db.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    # ids nunca voltam: o arquivo frio tira os pedidos mais antigos do
+    # banco e as marcas d'água (pivô, comprados juntos) dependem de id crescente
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -11,10 +14,12 @@ class Order(Base):
     total = Column(Float, nullable=False)
 
     # novos campos
+    # vendedora: seller_id é a referência; seller guarda o nome no momento da venda
+    seller_id = Column(Integer, ForeignKey("sellers.id"), nullable=True, index=True)
     seller = Column(String, nullable=True)
     payment = Column(String, nullable=False, default="pix")  # pix/credito/debito/dinheiro
     discount_type = Column(String, nullable=False, default="none")  # none/money/percent
     discount_value = Column(Float, nullable=False, default=0.0)
     note = Column(String, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
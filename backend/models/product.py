@@ -9,4 +9,11 @@ class Product(Base):
     description = Column(String, nullable=True)
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0)
+
+    # unidades presas em carrinhos abertos (ver services/reservations.py)
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
+
     active = Column(Boolean, default=True)
+
+    # sequência global de alterações (sync incremental dos terminais)
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0", index=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer
+from db.database import Base
+
+
+# co-ocorrência esparsa: em quantos pedidos os dois produtos saíram juntos.
+# Guardada nos dois sentidos (a,b) e (b,a) para ler a linha de um produto
+# pela PK; a diagonal (a,a) é o número de pedidos que contêm o produto.
+class ProductPair(Base):
+    __tablename__ = "product_pairs"
+
+    product_id = Column(Integer, primary_key=True)
+    related_id = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Float
+from db.database import Base
+
+
+# top-k pré-calculado de "comprados juntos" por produto (servido direto
+# em GET /products/{id}/related)
+class ProductRelated(Base):
+    __tablename__ = "product_related"
+
+    product_id = Column(Integer, primary_key=True)
+    related_id = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False)
+    confidence = Column(Float, nullable=False)  # P(related | product)
+    lift = Column(Float, nullable=False)  # confidence / P(related)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer
+from db.database import Base
+
+
+# linha única (id=1): até onde o índice de co-ocorrência já leu
+class RelatedState(Base):
+    __tablename__ = "related_state"
+
+    id = Column(Integer, primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)  # pedidos contados
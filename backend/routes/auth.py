@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import uuid
@@ -7,6 +7,16 @@ import re
 from db.database import get_db
 from models.user import User
 from core.security import verify_password, hash_password
+from core.principals import principals
+from services.rate_limit import (
+    IP_LIMIT_ENABLED,
+    TokenBucketLimiter,
+    client_ip,
+    limiter_stats,
+    login_email_limiter,
+    login_ip_limiter,
+    password_change_limiter,
+)
 
 router = APIRouter(tags=["Auth"])
 
@@ -34,10 +44,33 @@ def _validate_password_rules(pw: str) -> str | None:
     return None
 
 
+def _client_ip(request: Request) -> str:
+    return client_ip(request.client.host if request.client else None, request.headers.get("x-forwarded-for"))
+
+
+def _enforce_limit(limiter: TokenBucketLimiter, key: str):
+    # barato: roda antes de qualquer consulta ou hash
+    wait = limiter.hit(key)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Muitas tentativas. Aguarde e tente novamente.",
+            headers={"Retry-After": str(wait)},
+        )
+
+
 # =====================================
 # LOGIN
 # =====================================
-@router.post("/login")
+async def _login_limits(request: Request, email: str):
+    # async e declarada antes do get_db: o 429 sai direto do event loop,
+    # sem ocupar thread nem abrir sessão no banco
+    if IP_LIMIT_ENABLED:
+        _enforce_limit(login_ip_limiter, _client_ip(request))
+    _enforce_limit(login_email_limiter, email.strip().lower())
+
+
+@router.post("/login", dependencies=[Depends(_login_limits)])
 def login(email: str, password: str, db: Session = Depends(get_db)):
 
     user = db.query(User).filter(User.email == email).first()
@@ -55,6 +88,7 @@ def login(email: str, password: str, db: Session = Depends(get_db)):
             user.is_locked = True
 
         db.commit()
+        principals.invalidate(user.id)
         raise HTTPException(401, "Credenciais inválidas")
 
     # sucesso
@@ -96,6 +130,7 @@ def logout(authorization: str = Header(None)):
 @router.post("/change-password")
 def change_password(
     data: ChangePasswordRequest,
+    request: Request,
     authorization: str = Header(None),
     db: Session = Depends(get_db),
 ):
@@ -110,6 +145,9 @@ def change_password(
 
     user_id = SESSIONS[token]
 
+    _enforce_limit(password_change_limiter, f"ip:{_client_ip(request)}")
+    _enforce_limit(password_change_limiter, f"user:{user_id}")
+
     user = db.query(User).filter(User.id == user_id).first()
 
     if not user:
@@ -125,10 +163,19 @@ def change_password(
     user.failed_attempts = 0
 
     db.commit()
+    principals.invalidate(user.id)
 
     return {
         "message": "Senha alterada com sucesso",
         "role": user.role,
         "name": user.name,
         "email": user.email,
-    }
\ No newline at end of file
+    }
+
+
+# =====================================
+# MÉTRICAS DO RATE LIMIT
+# =====================================
+@router.get("/rate-limit")
+def rate_limit_stats():
+    return limiter_stats()
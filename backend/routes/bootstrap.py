@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from db.database import get_db
+from db.projection import fetch_rows, json_rows
+from models.notification import Notification
+from models.product import Product
+from models.seller import Seller
+from core.auth_deps import get_current_user
+from core.principals import Principal
+from routes.product import PRODUCT_COLUMNS
+from routes.seller import SELLER_COLUMNS
+from schemas.bootstrap import BootstrapResponse
+from services.catalog import catalog_version
+
+router = APIRouter(tags=["Bootstrap"])
+
+
+# =====================================
+# ABERTURA DO PDV (uma ida e volta só)
+# =====================================
+# Tudo que o terminal busca ao logar (perfil, catálogo, vendedoras,
+# notificações, versão do catálogo) numa resposta, com uma sessão de
+# banco e a autenticação resolvida uma vez (cache de principais).
+@router.get("/bootstrap", response_model=BootstrapResponse)
+def bootstrap(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # versão ANTES do catálogo: se um produto mudar no meio, o próximo
+    # /products/changes?since=version reenvia a alteração (nunca perde)
+    version = catalog_version(db)
+
+    products = fetch_rows(db, PRODUCT_COLUMNS, Product.active == True)
+    # mesma regra do GET /sellers: lista só para admin/gerente
+    sellers = []
+    if current_user.role in ("admin", "gerente"):
+        sellers = fetch_rows(db, SELLER_COLUMNS, Seller.active == True, order_by=Seller.name.asc())
+
+    # vendedora não escolhe: o PDV já manda o id dela (sellers.email é único)
+    seller_id = None
+    if current_user.role == "seller":
+        seller_id = db.query(Seller.id).filter(Seller.email == current_user.email).scalar()
+
+    unread = (
+        db.query(func.count(Notification.id))
+        .filter(Notification.for_role == current_user.role, Notification.read == False)
+        .scalar()
+    )
+
+    return json_rows({
+        "user": {
+            "id": current_user.id,
+            "name": current_user.name,
+            "email": current_user.email,
+            "role": current_user.role,
+            "must_change_password": current_user.must_change_password,
+            "seller_id": seller_id,
+        },
+        "catalog_version": version,
+        "products": products,
+        "sellers": sellers,
+        "unread_notifications": unread or 0,
+    })
@@ -0,0 +1,53 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from db.database import get_db
+from schemas.cart import CartHoldRequest, CartResponse
+from services.reservations import Cart, ReservationError, reservations
+
+router = APIRouter(tags=["Carts"])
+
+
+def _cart_response(cart: Cart):
+    return {
+        "id": cart.id,
+        "expires_in": max(0, int(cart.expires_at - time.monotonic())),
+        "items": [
+            {"product_id": pid, "quantity": qty}
+            for pid, qty in cart.items.items()
+        ],
+    }
+
+
+# ABRIR CARRINHO
+@router.post("/", response_model=CartResponse)
+def open_cart():
+    return _cart_response(reservations.open_cart())
+
+
+# CONSULTAR CARRINHO
+@router.get("/{cart_id}", response_model=CartResponse)
+def get_cart(cart_id: str):
+    try:
+        return _cart_response(reservations.get_cart(cart_id))
+    except ReservationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+# RESERVAR / AJUSTAR QUANTIDADE (renova o prazo do carrinho)
+@router.put("/{cart_id}/items", response_model=CartResponse)
+def hold_item(cart_id: str, payload: CartHoldRequest, db: Session = Depends(get_db)):
+    try:
+        cart = reservations.set_hold(db, cart_id, payload.product_id, payload.quantity)
+    except ReservationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return _cart_response(cart)
+
+
+# CANCELAR CARRINHO (libera tudo)
+@router.delete("/{cart_id}")
+def cancel_cart(cart_id: str, db: Session = Depends(get_db)):
+    reservations.release_cart(db, cart_id)
+    return {"message": "Carrinho cancelado"}
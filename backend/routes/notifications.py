@@ -1,14 +1,20 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from db.database import get_db
+from db.projection import fetch_rows, json_rows
 from models.notification import Notification
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
+NOTIFICATION_COLUMNS = list(Notification.__table__.columns)
+
 @router.get("/")
 def list_notifications(
     db: Session = Depends(get_db),
 ):
-    return db.query(Notification).filter(
-        Notification.for_role == "admin"
-    ).order_by(Notification.id.desc()).all()
\ No newline at end of file
+    return json_rows(fetch_rows(
+        db,
+        NOTIFICATION_COLUMNS,
+        Notification.for_role == "admin",
+        order_by=Notification.id.desc(),
+    ))
\ No newline at end of file
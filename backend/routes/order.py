@@ -1,17 +1,76 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from db.database import get_db
+from db.projection import columns_for, json_rows, run_rows, select_rows
 from models.order import Order
 from models.order_item import OrderItem
 from models.product import Product
+from models.seller import Seller
 from schemas.order import OrderCreate, OrderResponse
+from services.catalog import next_change_seq
+from services.order_hooks import order_event, run_order_hooks
+from services.reservations import ReservationError, reservations
+from services.write_pipeline import PipelineBusy, order_pipeline
 
 router = APIRouter(tags=["Orders"])
 
+ORDER_COLUMNS = columns_for(Order, OrderResponse)
+
+# =====================================
+# CONSULTAS (também conferidas por db/synthetic.py check)
+# =====================================
+def orders_query(seller_id: int | None = None):
+    criteria = [Order.seller_id == seller_id] if seller_id is not None else []
+    return select_rows(ORDER_COLUMNS, *criteria, order_by=Order.id.desc())
+
+
+def product_for_sale_query(product_id: int):
+    return select(Product).where(Product.id == product_id, Product.active == True)
+
+
+def take_stock_stmt(product_id: int, quantity: int, from_hold: int):
+    """Baixa condicional: só atualiza se o disponível (fora as reservas dos outros) cobre a venda."""
+    return (
+        update(Product)
+        .where(
+            Product.id == product_id,
+            Product.stock - Product.reserved + from_hold >= quantity,
+        )
+        .values(
+            stock=Product.stock - quantity,
+            reserved=Product.reserved - from_hold,
+            change_seq=next_change_seq(),
+        )
+    )
+
+
 @router.get("/", response_model=list[OrderResponse])
-def list_orders(db: Session = Depends(get_db)):
-    return db.query(Order).order_by(Order.id.desc()).all()
+def list_orders(db: Session = Depends(get_db), seller_id: int | None = None):
+    return json_rows(run_rows(db, orders_query(seller_id)))
+
+
+def _resolve_seller(order: OrderCreate, db: Session):
+    """Retorna (seller_id, nome) da vendedora da venda."""
+    if order.seller_id is not None:
+        seller = db.query(Seller).filter(Seller.id == order.seller_id).first()
+        if not seller:
+            raise HTTPException(status_code=404, detail="Vendedora não encontrada")
+        return seller.id, seller.name
+
+    name = order.seller.strip() if order.seller else None
+    if not name:
+        return None, None
+
+    # compatibilidade: front antigo manda só o nome
+    seller = (
+        db.query(Seller)
+        .filter(func.lower(Seller.name) == name.lower())
+        .order_by(Seller.active.desc(), Seller.id)
+        .first()
+    )
+    return (seller.id if seller else None), name
 
 @router.post("/", response_model=OrderResponse)
 def create_order(order: OrderCreate, db: Session = Depends(get_db)):
@@ -25,23 +84,57 @@ def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     if discount_type == "percent" and discount_value > 100:
         raise HTTPException(status_code=400, detail="Desconto percentual máximo é 100")
 
+    # reservas do carrinho (se houver) viram venda nesta mesma transação
+    cart = None
+    if order.cart_id:
+        try:
+            cart = reservations.claim(order.cart_id)
+        except ReservationError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    held = dict(cart.items) if cart else {}
+
+    try:
+        if order_pipeline.running:
+            db_order = _place_order_pipelined(order, held)
+        else:
+            db_order = _place_order(order, db, held)
+    except Exception:
+        db.rollback()
+        if cart:
+            reservations.restore(cart)
+        raise
+
+    return db_order
+
+
+def _apply_order(order: OrderCreate, db: Session, held: dict[int, int]):
+    """Valida, baixa estoque e grava pedido + itens sem dar commit."""
+    discount_type = order.discount_type
+    discount_value = float(order.discount_value or 0)
+
+    seller_id, seller_name = _resolve_seller(order, db)
+
     # calcula subtotal e baixa estoque
     subtotal = 0.0
     order_items = []
 
     for item in order.items:
-        product = db.query(Product).filter(
-            Product.id == item.product_id,
-            Product.active == True
-        ).first()
+        product = db.scalars(product_for_sale_query(item.product_id)).first()
 
         if not product:
             raise HTTPException(status_code=404, detail="Produto não encontrado")
 
-        if product.stock < item.quantity:
+        # disponível = estoque - reservas dos outros carrinhos
+        from_hold = min(held.get(product.id, 0), item.quantity)
+
+        updated = db.execute(take_stock_stmt(product.id, item.quantity, from_hold)).rowcount
+
+        if not updated:
             raise HTTPException(status_code=400, detail=f"Estoque insuficiente para {product.name}")
 
-        product.stock -= item.quantity
+        if from_hold:
+            held[product.id] -= from_hold
 
         line_total = float(product.price) * int(item.quantity)
         subtotal += line_total
@@ -52,6 +145,15 @@ def create_order(order: OrderCreate, db: Session = Depends(get_db)):
             "price": float(product.price)
         })
 
+    # reservas que sobraram no carrinho são liberadas
+    for product_id, quantity in held.items():
+        if quantity > 0:
+            db.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(reserved=Product.reserved - quantity, change_seq=next_change_seq())
+            )
+
     # desconto
     discount_amount = 0.0
     if discount_type == "money":
@@ -65,7 +167,8 @@ def create_order(order: OrderCreate, db: Session = Depends(get_db)):
 
     db_order = Order(
         total=total,
-        seller=(order.seller.strip() if order.seller else None),
+        seller_id=seller_id,
+        seller=seller_name,
         payment=order.payment,
         discount_type=discount_type,
         discount_value=discount_value,
@@ -73,13 +176,40 @@ def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    db.flush()
 
     for it in order_items:
         db.add(OrderItem(order_id=db_order.id, **it))
 
+    db.flush()
+    return db_order, order_items
+
+
+def _place_order(order: OrderCreate, db: Session, held: dict[int, int]):
+    db_order, order_items = _apply_order(order, db, held)
+
+    # um único commit: baixa de estoque, reservas e itens juntos
     db.commit()
     db.refresh(db_order)
 
+    # contadores ao vivo etc. (ver services/order_hooks.py)
+    run_order_hooks(order_event(db_order, order_items))
+
     return db_order
+
+
+def _place_order_pipelined(order: OrderCreate, held: dict[int, int]):
+    # roda na thread gravadora, dentro do savepoint deste pedido
+    def work(db: Session):
+        db_order, order_items = _apply_order(order, db, held)
+        db.refresh(db_order)
+        return OrderResponse.model_validate(db_order), order_event(db_order, order_items)
+
+    try:
+        response, event = order_pipeline.submit(work)
+    except PipelineBusy:
+        raise HTTPException(status_code=503, detail="Sistema ocupado, tente novamente")
+
+    # só chega aqui depois do COMMIT do lote
+    run_order_hooks(event)
+    return response
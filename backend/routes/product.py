@@ -1,13 +1,20 @@
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from db.database import get_db
+from db.projection import columns_for, fetch_rows, json_rows, run_rows, select_rows
 from models.product import Product
-from schemas.product import ProductCreate, ProductResponse
+from schemas.product import ProductCreate, ProductResponse, ProductChangesResponse, RelatedProductResponse
+from services.catalog import next_change_seq
+from services.related import related_index
 from models.stock_audit import StockAudit
 from models.notification import Notification
 
 router = APIRouter(tags=["Products"])
 
+PRODUCT_COLUMNS = columns_for(Product, ProductResponse)
+
 
 # CRIAR (admin/gerente)
 @router.post("/", response_model=ProductResponse)
@@ -15,7 +22,7 @@ def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
 ):
-    db_product = Product(**product.model_dump())
+    db_product = Product(**product.model_dump(), change_seq=next_change_seq())
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
@@ -27,7 +34,7 @@ def create_product(
 def list_products(
     db: Session = Depends(get_db),
 ):
-    return db.query(Product).filter(Product.active == True).all()
+    return json_rows(fetch_rows(db, PRODUCT_COLUMNS, Product.active == True))
 
 
 # UPDATE (admin/gerente)
@@ -48,8 +55,11 @@ def update_product(
     for field, value in product.model_dump().items():
         setattr(db_product, field, value)
 
+    db_product.change_seq = next_change_seq()
+
     db.commit()
     db.refresh(db_product)
+    return db_product
 
 
 
@@ -64,6 +74,7 @@ def delete_product(
         raise HTTPException(status_code=404, detail="Produto não encontrado")
 
     db_product.active = False
+    db_product.change_seq = next_change_seq()
     db.commit()
     return {"message": "Produto desativado com sucesso"}
 
@@ -71,4 +82,53 @@ def delete_product(
 # LISTAR SOMENTE PRODUTOS ATIVOS (público ou logado)
 @router.get("/public", response_model=list[ProductResponse])
 def list_active_products(db: Session = Depends(get_db)):
-    return db.query(Product).filter(Product.active == True).all()
\ No newline at end of file
+    return json_rows(fetch_rows(db, PRODUCT_COLUMNS, Product.active == True))
+
+
+def changes_query(since: int, limit: int):
+    # uma linha a mais só pra saber se há próxima página
+    return select_rows(
+        PRODUCT_COLUMNS,
+        Product.change_seq > since,
+        order_by=Product.change_seq.asc(),
+        limit=limit + 1,
+    )
+
+
+# SYNC INCREMENTAL DO CATÁLOGO (terminais)
+# devolve só o que mudou depois de `since` + a nova marca d'água
+@router.get("/changes", response_model=ProductChangesResponse)
+def list_product_changes(
+    since: int = 0,
+    limit: int = 1000,
+    db: Session = Depends(get_db),
+):
+    limit = max(1, min(limit, 5000))
+
+    rows = run_rows(db, changes_query(since, limit))
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # marca d'água = última alteração entregue (nunca pula um commit concorrente)
+    version = rows[-1]["change_seq"] if rows else since
+
+    return {
+        "version": version,
+        "has_more": has_more,
+        "changed": [r for r in rows if r["active"]],
+        "deactivated": [r["id"] for r in rows if not r["active"]],
+    }
+
+
+# COMPRADOS JUNTOS (sugestão no PDV)
+# lê o top-k pré-calculado; ordena por confiança ou lift
+@router.get("/{product_id}/related", response_model=list[RelatedProductResponse])
+def list_related_products(
+    product_id: int,
+    by: Literal["confidence", "lift"] = "confidence",
+    limit: int = 5,
+    db: Session = Depends(get_db),
+):
+    limit = max(1, min(limit, related_index.top_k))
+    return related_index.related(db, product_id, by, limit)
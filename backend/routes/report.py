@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import date, datetime, timedelta
-from db.database import get_db
+from db.snapshot import get_report_db
+from db.archive import order_entities
 from models.order import Order
-from models.order_item import OrderItem
 from models.product import Product
-from schemas.report import ReportSummaryResponse
+from models.seller import Seller
+from schemas.report import ReportSummaryResponse, PivotRequest, PivotResponse
+from services.live_kpis import live_kpis
+from services.pivot import pivot_engine
 
 router = APIRouter(tags=["Reports"])
 
@@ -14,9 +21,71 @@ def _start_of_today():
     now = datetime.now()
     return datetime(now.year, now.month, now.day)
 
+# =====================================
+# CONSULTAS DO RESUMO (também conferidas por db/synthetic.py check)
+# =====================================
+# O / I: Order / OrderItem ou as views com histórico (order_entities)
+def period_orders_query(O, start: datetime):
+    # quantidade + menor id do período (limite dos itens, ver abaixo)
+    return select(func.count(O.id), func.min(O.id)).where(O.created_at >= start)
+
+
+def summary_queries(O, I, start: datetime, first_id: int, start_today: datetime, limit_top: int, limit_recent: int) -> dict:
+    # Itens filtram por "order_id IN (pedidos do período)" em vez de JOIN:
+    # JOIN entre duas views UNION ALL materializa all_order_items inteira.
+    # "order_id >= first_id" não muda o resultado (todo pedido do período
+    # tem id >= o menor deles), mas é o filtro que o SQLite empurra para
+    # dentro de cada ramo da view e vira busca em ix_order_items_order_id.
+    period_ids = select(O.id).where(O.created_at >= start)
+    return {
+        # revenue no período
+        "revenue": select(func.coalesce(func.sum(O.total), 0.0)).where(O.created_at >= start),
+        # itens no período (pela tabela order_items)
+        "items": (
+            select(func.coalesce(func.sum(I.quantity), 0))
+            .where(I.order_id >= first_id, I.order_id.in_(period_ids))
+        ),
+        # hoje (sempre nas tabelas quentes)
+        "revenue_today": select(func.coalesce(func.sum(Order.total), 0.0)).where(Order.created_at >= start_today),
+        "orders_today": select(func.count(Order.id)).where(Order.created_at >= start_today),
+        # top produtos
+        "top_products": (
+            select(
+                I.product_id.label("product_id"),
+                Product.name.label("name"),
+                func.coalesce(func.sum(I.quantity), 0).label("qty"),
+                func.coalesce(func.sum(I.price * I.quantity), 0.0).label("revenue"),
+            )
+            .join(Product, Product.id == I.product_id)
+            .where(I.order_id >= first_id, I.order_id.in_(period_ids))
+            .group_by(I.product_id, Product.name)
+            .order_by(func.sum(I.price * I.quantity).desc())
+            .limit(limit_top)
+        ),
+        # top vendedoras: agrupa pelo id (inteiro) e busca o nome atual
+        "top_sellers": (
+            select(
+                O.seller_id.label("seller_id"),
+                func.coalesce(Seller.name, "Sem vendedora").label("seller"),
+                func.count(O.id).label("orders"),
+                func.coalesce(func.sum(O.total), 0.0).label("revenue"),
+            )
+            .outerjoin(Seller, Seller.id == O.seller_id)
+            .where(O.created_at >= start)
+            # "+ 0" impede o SQLite de varrer ix_orders_seller_id só para
+            # evitar a ordenação do GROUP BY; o filtro por data é bem mais seletivo
+            .group_by(O.seller_id + 0, Seller.name)
+            .order_by(func.sum(O.total).desc())
+            .limit(limit_top)
+        ),
+        # últimas vendas
+        "recent_orders": select(Order).order_by(Order.created_at.desc()).limit(limit_recent),
+    }
+
+
 @router.get("/summary", response_model=ReportSummaryResponse)
 def report_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     days: int = 30,
     limit_top: int = 5,
     limit_recent: int = 10,
@@ -27,63 +96,26 @@ def report_summary(
     date_from = today - timedelta(days=days - 1)
     date_to = today
 
-    # revenue / orders no período
-    revenue = db.query(func.coalesce(func.sum(Order.total), 0.0)).scalar() or 0.0
-    orders = db.query(func.count(Order.id)).scalar() or 0
+    # período que já foi para o arquivo usa as views com histórico
+    O, I = order_entities(date_from)
+    start = datetime(date_from.year, date_from.month, date_from.day)
 
-    # itens no período (pela tabela order_items)
-    items = db.query(func.coalesce(func.sum(OrderItem.quantity), 0)).scalar() or 0
+    orders, first_id = db.execute(period_orders_query(O, start)).one()
+    q = summary_queries(O, I, start, first_id or 0, _start_of_today(), limit_top, limit_recent)
 
-    # hoje
-    start_today = _start_of_today()
-    revenue_today = (
-        db.query(func.coalesce(func.sum(Order.total), 0.0))
-        .filter(Order.created_at >= start_today)
-        .scalar()
-        or 0.0
-    )
-    orders_today = (
-        db.query(func.count(Order.id))
-        .filter(Order.created_at >= start_today)
-        .scalar()
-        or 0
-    )
-
-    # top produtos
-    top_products = (
-        db.query(
-            OrderItem.product_id.label("product_id"),
-            Product.name.label("name"),
-            func.coalesce(func.sum(OrderItem.quantity), 0).label("qty"),
-            func.coalesce(func.sum(OrderItem.price * OrderItem.quantity), 0.0).label("revenue"),
-        )
-        .join(Product, Product.id == OrderItem.product_id)
-        .group_by(OrderItem.product_id, Product.name)
-        .order_by(func.sum(OrderItem.price * OrderItem.quantity).desc())
-        .limit(limit_top)
-        .all()
-    )
+    revenue = db.execute(q["revenue"]).scalar() or 0.0
+    revenue_today = db.execute(q["revenue_today"]).scalar() or 0.0
+    orders_today = db.execute(q["orders_today"]).scalar() or 0
 
-    # top vendedoras (se seller existir no Order)
-    top_sellers = (
-        db.query(
-            func.coalesce(Order.seller, "Sem vendedora").label("seller"),
-            func.count(Order.id).label("orders"),
-            func.coalesce(func.sum(Order.total), 0.0).label("revenue"),
-        )
-        .group_by(func.coalesce(Order.seller, "Sem vendedora"))
-        .order_by(func.sum(Order.total).desc())
-        .limit(limit_top)
-        .all()
-    )
+    # sem vendas no período não há itens a somar
+    if orders:
+        items = db.execute(q["items"]).scalar() or 0
+        top_products = db.execute(q["top_products"]).all()
+    else:
+        items, top_products = 0, []
 
-    # últimas vendas
-    recent_orders = (
-        db.query(Order)
-        .order_by(Order.created_at.desc())
-        .limit(limit_recent)
-        .all()
-    )
+    top_sellers = db.execute(q["top_sellers"]).all()
+    recent_orders = db.scalars(q["recent_orders"]).all()
 
     return {
         "date_from": date_from,
@@ -98,7 +130,7 @@ def report_summary(
             for r in top_products
         ],
         "top_sellers": [
-            {"seller": r.seller, "orders": int(r.orders), "revenue": float(r.revenue)}
+            {"seller_id": r.seller_id, "seller": r.seller, "orders": int(r.orders), "revenue": float(r.revenue)}
             for r in top_sellers
         ],
         "recent_orders": [
@@ -111,4 +143,54 @@ def report_summary(
             }
             for o in recent_orders
         ],
-    }
\ No newline at end of file
+    }
+
+
+# =====================================
+# PIVÔ AD-HOC (vendedora x pagamento x dia da semana, produto x hora ...)
+# =====================================
+@router.post("/pivot", response_model=PivotResponse)
+def report_pivot(payload: PivotRequest):
+    return pivot_engine.pivot(
+        dimensions=list(payload.dimensions),
+        measures=list(payload.measures),
+        filters=payload.filters.model_dump(),
+        date_from=payload.date_from,
+        date_to=payload.date_to,
+        limit=payload.limit,
+    )
+
+
+# =====================================
+# KPIs AO VIVO
+# =====================================
+SSE_HEARTBEAT_SECONDS = 15
+
+
+@router.get("/live/summary")
+def live_summary():
+    return live_kpis.snapshot()
+
+
+@router.get("/live")
+async def live_stream(request: Request):
+    queue = live_kpis.subscribe()
+
+    async def events():
+        try:
+            snapshot = json.dumps(live_kpis.snapshot(), ensure_ascii=False)
+            yield f"event: snapshot\ndata: {snapshot}\n\n"
+
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            live_kpis.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from db.database import get_db
+from db.projection import columns_for, fetch_rows, json_rows
 from models.seller import Seller
 from models.user import User
 from schemas.seller import (
@@ -12,9 +13,13 @@ from schemas.seller import (
 )
 from core.security import hash_password
 from core.permissions import require_roles
+from core.principals import Principal, principals
+from services.live_kpis import live_kpis
 
 router = APIRouter(tags=["Sellers"])
 
+SELLER_COLUMNS = columns_for(Seller, SellerResponse)
+
 
 # ===============================
 # LISTAR VENDEDORAS
@@ -23,9 +28,9 @@ router = APIRouter(tags=["Sellers"])
 @router.get("/", response_model=list[SellerResponse])
 def list_sellers(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles("admin", "gerente")),
+    current_user: Principal = Depends(require_roles("admin", "gerente")),
 ):
-    return db.query(Seller).order_by(Seller.name.asc()).all()
+    return json_rows(fetch_rows(db, SELLER_COLUMNS, order_by=Seller.name.asc()))
 
 
 # ===============================
@@ -36,7 +41,7 @@ def list_sellers(
 def create_seller(
     payload: SellerCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles("admin", "gerente")),
+    current_user: Principal = Depends(require_roles("admin", "gerente")),
 ):
     name = payload.name.strip()
     email = payload.email.strip().lower()
@@ -97,13 +102,15 @@ def update_seller(
     seller_id: int,
     payload: SellerUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles("admin", "gerente")),
+    current_user: Principal = Depends(require_roles("admin", "gerente")),
 ):
     seller = db.query(Seller).filter(Seller.id == seller_id).first()
 
     if not seller:
         raise HTTPException(status_code=404, detail="Vendedora não encontrada")
 
+    user = db.query(User).filter(User.email == seller.email).first()
+
     if payload.name is not None:
         name = payload.name.strip()
 
@@ -112,7 +119,6 @@ def update_seller(
 
         seller.name = name
 
-        user = db.query(User).filter(User.email == seller.email).first()
         if user:
             user.name = name
 
@@ -121,6 +127,11 @@ def update_seller(
 
     db.commit()
     db.refresh(seller)
+
+    if user:
+        principals.invalidate(user.id)
+    if payload.name is not None:
+        live_kpis.rename_seller(seller.id, seller.name)
     return seller
 
 
@@ -132,7 +143,7 @@ def update_seller(
 def delete_seller(
     seller_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles("admin")),
+    current_user: Principal = Depends(require_roles("admin")),
 ):
     seller = db.query(Seller).filter(Seller.id == seller_id).first()
 
@@ -147,4 +158,7 @@ def delete_seller(
 
     db.commit()
 
+    if user:
+        principals.invalidate(user.id)
+
     return {"ok": True}
\ No newline at end of file
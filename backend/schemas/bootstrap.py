@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+from schemas.product import ProductResponse
+from schemas.seller import SellerResponse
+
+
+class BootstrapUser(BaseModel):
+    id: int
+    name: str
+    email: str
+    role: str
+    must_change_password: bool
+    # vendedora logada: o próprio cadastro (ligado pelo e-mail), pra venda ir por id
+    seller_id: int | None = None
+
+
+class BootstrapResponse(BaseModel):
+    user: BootstrapUser
+    catalog_version: int
+    products: list[ProductResponse]
+    sellers: list[SellerResponse]
+    unread_notifications: int
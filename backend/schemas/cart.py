@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+
+
+class CartHoldRequest(BaseModel):
+    product_id: int
+    # 0 libera a reserva do produto
+    quantity: int = Field(..., ge=0)
+
+
+class CartItemResponse(BaseModel):
+    product_id: int
+    quantity: int
+
+
+class CartResponse(BaseModel):
+    id: str
+    expires_in: int  # segundos
+    items: list[CartItemResponse]
@@ -9,6 +9,8 @@ class OrderItemCreate(BaseModel):
 class OrderCreate(BaseModel):
     items: list[OrderItemCreate]
 
+    # seller_id tem prioridade; seller (nome) continua aceito
+    seller_id: Optional[int] = None
     seller: Optional[str] = None
     payment: Literal["pix", "credito", "debito", "dinheiro"] = "pix"
 
@@ -17,10 +19,14 @@ class OrderCreate(BaseModel):
 
     note: Optional[str] = None
 
+    # carrinho com reservas abertas (POST /carts); as reservas viram venda
+    cart_id: Optional[str] = None
+
 class OrderResponse(BaseModel):
     id: int
     total: float
 
+    seller_id: Optional[int] = None
     seller: Optional[str] = None
     payment: str
     discount_type: str
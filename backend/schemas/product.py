@@ -12,6 +12,24 @@ class ProductCreate(ProductBase):
 class ProductResponse(ProductBase):
     id: int
     active: bool
+    reserved: int = 0
+    change_seq: int = 0
 
     class Config:
         from_attributes = True
+
+
+class ProductChangesResponse(BaseModel):
+    version: int
+    has_more: bool
+    changed: list[ProductResponse]
+    deactivated: list[int]
+
+
+class RelatedProductResponse(BaseModel):
+    product_id: int
+    name: str
+    price: float
+    orders: int  # pedidos em que saíram juntos
+    confidence: float
+    lift: float
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
-from typing import List
+from typing import List, Literal
 
 class ReportTopProduct(BaseModel):
     product_id: int
@@ -9,6 +9,7 @@ class ReportTopProduct(BaseModel):
     revenue: float
 
 class ReportTopSeller(BaseModel):
+    seller_id: int | None = None
     seller: str
     orders: int
     revenue: float
@@ -33,4 +34,31 @@ class ReportSummaryResponse(BaseModel):
 
     top_products: List[ReportTopProduct]
     top_sellers: List[ReportTopSeller]
-    recent_orders: List[ReportRecentOrder]
\ No newline at end of file
+    recent_orders: List[ReportRecentOrder]
+
+
+PivotDimension = Literal["seller", "payment", "product", "weekday", "hour", "day", "month"]
+PivotMeasure = Literal["revenue", "net_revenue", "qty", "items", "orders"]
+
+class PivotFilters(BaseModel):
+    seller_id: List[int] = []
+    payment: List[str] = []
+    product_id: List[int] = []
+    weekday: List[int] = []  # 0 = segunda
+    hour: List[int] = []
+
+class PivotRequest(BaseModel):
+    dimensions: List[PivotDimension] = Field(default_factory=list, max_length=4)
+    measures: List[PivotMeasure] = Field(default_factory=lambda: ["revenue"], min_length=1)
+    filters: PivotFilters = PivotFilters()
+    date_from: date | None = None
+    date_to: date | None = None
+    limit: int = Field(1000, ge=1, le=10000)
+
+class PivotResponse(BaseModel):
+    dimensions: List[str]
+    measures: List[str]
+    rows: List[dict]
+    total_rows: int
+    loaded_rows: int
+    elapsed_ms: float
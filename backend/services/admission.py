@@ -0,0 +1,221 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from starlette.responses import JSONResponse
+
+# =====================================
+# CONTROLE DE ADMISSÃO POR PRIORIDADE
+# =====================================
+# Todas as rotas dividem o mesmo threadpool e o mesmo banco: meia dúzia
+# de /reports/summary ou listagens grandes não pode travar o POST
+# /orders do caixa. Cada request cai numa classe com limite próprio de
+# concorrência e fila própria:
+#
+#   critical  checkout, carrinho, login   fila sem descarte
+#   catalog   leituras de catálogo/PDV    descarta acima do orçamento
+#   reports   relatórios e histórico      descarta acima do orçamento
+#
+# Na chegada, se a espera estimada (fila x tempo médio de atendimento /
+# limite) já estoura o orçamento de latência da classe, a resposta é 503
+# com Retry-After na hora; senão espera na fila no máximo o orçamento.
+# Rotas sem classe (escritas de cadastro, /health, SSE) passam direto.
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_CONTROL", "1") == "1"
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+@dataclass
+class PriorityClass:
+    name: str
+    limit: int
+    max_queue: int | None = None  # None = fila sem limite
+    budget: float | None = None  # segundos; None = nunca descarta
+
+    active: int = 0
+    admitted: int = 0
+    shed: int = 0
+    max_wait: float = 0.0
+    total_wait: float = 0.0
+    # tempo médio de atendimento (média móvel exponencial), para estimar a espera
+    avg_service: float = 0.05
+    _waiters: deque = field(default_factory=deque)
+
+    def estimated_wait(self) -> float:
+        return (len(self._waiters) + 1) * self.avg_service / self.limit
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "budget_ms": round(self.budget * 1000) if self.budget is not None else None,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_service_ms": round(self.avg_service * 1000, 2),
+        }
+
+
+class Shed(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
+
+# (classe, método ou None = qualquer, prefixo do caminho) - primeira que casar
+_RULES = [
+    (None, "GET", "/reports/live"),  # SSE: conexão longa, não ocupa vaga
+    ("critical", None, "/auth"),
+    ("critical", None, "/carts"),
+    ("critical", "POST", "/orders"),
+    ("reports", None, "/reports"),
+    ("reports", "GET", "/orders"),  # histórico de vendas
+    ("catalog", "GET", "/products"),
+    ("catalog", "GET", "/sellers"),
+    ("catalog", "GET", "/bootstrap"),
+    ("catalog", "GET", "/notifications"),
+]
+
+
+class AdmissionController:
+    def __init__(self):
+        self.classes = {
+            "critical": PriorityClass(
+                "critical",
+                limit=_env_int("ADMISSION_CRITICAL_LIMIT", 32),
+            ),
+            "catalog": PriorityClass(
+                "catalog",
+                limit=_env_int("ADMISSION_CATALOG_LIMIT", 12),
+                max_queue=_env_int("ADMISSION_CATALOG_QUEUE", 64),
+                budget=_env_int("ADMISSION_CATALOG_BUDGET_MS", 2000) / 1000.0,
+            ),
+            "reports": PriorityClass(
+                "reports",
+                limit=_env_int("ADMISSION_REPORTS_LIMIT", 3),
+                max_queue=_env_int("ADMISSION_REPORTS_QUEUE", 12),
+                budget=_env_int("ADMISSION_REPORTS_BUDGET_MS", 1000) / 1000.0,
+            ),
+        }
+
+    def classify(self, method: str, path: str) -> PriorityClass | None:
+        for name, rule_method, prefix in _RULES:
+            if rule_method is not None and rule_method != method:
+                continue
+            if path == prefix or path.startswith(prefix + "/"):
+                return self.classes[name] if name else None
+        return None
+
+    # ---------- vagas ----------
+    def _reject(self, pc: PriorityClass, wait: float):
+        pc.shed += 1
+        raise Shed(max(1, math.ceil(wait)))
+
+    async def acquire(self, pc: PriorityClass) -> float:
+        """Espera uma vaga da classe. Retorna o tempo de fila; Shed se descartado."""
+        if pc.active < pc.limit and not pc._waiters:
+            pc.active += 1
+            self._admitted(pc, 0.0)
+            return 0.0
+
+        if pc.budget is not None:
+            estimate = pc.estimated_wait()
+            if (pc.max_queue is not None and len(pc._waiters) >= pc.max_queue) or estimate > pc.budget:
+                self._reject(pc, estimate)
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        pc._waiters.append(waiter)
+        try:
+            if pc.budget is None:
+                await waiter
+            else:
+                await asyncio.wait_for(asyncio.shield(waiter), pc.budget)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._drop(pc, waiter)
+                self._reject(pc, pc.estimated_wait())
+            # a vaga chegou junto com o timeout: usa
+        except BaseException:
+            # cliente desistiu (cancelamento)
+            if waiter.done() and not waiter.cancelled():
+                self.release(pc)
+            else:
+                self._drop(pc, waiter)
+            raise
+
+        waited = time.perf_counter() - started
+        self._admitted(pc, waited)
+        return waited
+
+    @staticmethod
+    def _drop(pc: PriorityClass, waiter: asyncio.Future):
+        waiter.cancel()
+        try:
+            pc._waiters.remove(waiter)
+        except ValueError:
+            pass  # release() já tirou da fila
+
+    @staticmethod
+    def _admitted(pc: PriorityClass, waited: float):
+        pc.admitted += 1
+        pc.total_wait += waited
+        pc.max_wait = max(pc.max_wait, waited)
+
+    def release(self, pc: PriorityClass, service_time: float | None = None):
+        if service_time is not None:
+            pc.avg_service = 0.9 * pc.avg_service + 0.1 * service_time
+
+        # passa a vaga direto para o próximo da fila (active não muda)
+        while pc._waiters:
+            waiter = pc._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        pc.active -= 1
+
+    def stats(self) -> dict:
+        return {"enabled": ADMISSION_ENABLED, **{name: pc.stats() for name, pc in self.classes.items()}}
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI: segura a vaga da classe até a resposta terminar."""
+
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            return await self.app(scope, receive, send)
+
+        pc = self.controller.classify(scope["method"], scope["path"])
+        if pc is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            await self.controller.acquire(pc)
+        except Shed as e:
+            response = JSONResponse(
+                {"detail": "Servidor ocupado, tente novamente em instantes"},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            return await response(scope, receive, send)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(pc, time.perf_counter() - started)
@@ -0,0 +1,24 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models.product import Product
+
+# =====================================
+# VERSÃO DO CATÁLOGO (sync incremental)
+# =====================================
+# Toda escrita em produto grava change_seq = max(change_seq) + 1 no mesmo
+# statement; como o SQLite serializa as escritas, a sequência é
+# monotônica. O terminal guarda o maior valor que viu e pede só o que
+# mudou depois dele (GET /products/changes?since=N).
+
+
+def next_change_seq():
+    """Expressão SQL para usar em INSERT/UPDATE de products."""
+    return (
+        select(func.coalesce(func.max(Product.change_seq), 0) + 1)
+        .scalar_subquery()
+    )
+
+
+def catalog_version(db: Session) -> int:
+    return db.query(func.coalesce(func.max(Product.change_seq), 0)).scalar() or 0
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import threading
+from datetime import date, datetime
+
+from sqlalchemy import func
+
+from db.database import SessionLocal
+from models.order import Order
+from models.order_item import OrderItem
+from models.product import Product
+from models.seller import Seller
+from services.order_hooks import OrderEvent, on_order_committed
+
+# =====================================
+# KPIs AO VIVO (contadores incrementais do dia)
+# =====================================
+# Semeados do banco na subida e atualizados por um hook pós-commit de
+# create_order, então cada venda custa O(1) aqui em vez de um
+# /reports/summary inteiro. Dashboards conectados em /reports/live
+# recebem o delta de cada venda por SSE.
+
+TOP_K = 5
+SUBSCRIBER_QUEUE_SIZE = 100
+NO_SELLER = "Sem vendedora"
+
+
+def _start_of_today():
+    now = datetime.now()
+    return datetime(now.year, now.month, now.day)
+
+
+class LiveKpis:
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._reset(date.today())
+
+    def _reset(self, day: date):
+        self.day = day
+        self.revenue = 0.0
+        self.orders = 0
+        self.sellers: dict[int | None, dict] = {}
+        self.payments: dict[str, dict] = {}
+        self.products: dict[int, dict] = {}
+        # top-k por receita: no máximo k entradas. Totais do dia só
+        # crescem, então um produto fora do top só entra superando o menor.
+        self.top: dict[int, float] = {}
+        self._names: dict[int, str] = {}
+        self._seller_names: dict[int, str] = {}
+
+    # ---------- carga inicial ----------
+    def seed(self):
+        start = _start_of_today()
+        db = SessionLocal()
+        try:
+            sellers = (
+                db.query(
+                    Order.seller_id,
+                    Seller.name,
+                    func.count(Order.id),
+                    func.coalesce(func.sum(Order.total), 0.0),
+                )
+                .outerjoin(Seller, Seller.id == Order.seller_id)
+                .filter(Order.created_at >= start)
+                .group_by(Order.seller_id, Seller.name)
+                .all()
+            )
+            payments = (
+                db.query(
+                    Order.payment,
+                    func.count(Order.id),
+                    func.coalesce(func.sum(Order.total), 0.0),
+                )
+                .filter(Order.created_at >= start)
+                .group_by(Order.payment)
+                .all()
+            )
+            products = (
+                db.query(
+                    OrderItem.product_id,
+                    Product.name,
+                    func.sum(OrderItem.quantity),
+                    func.sum(OrderItem.price * OrderItem.quantity),
+                )
+                .join(Order, Order.id == OrderItem.order_id)
+                .join(Product, Product.id == OrderItem.product_id)
+                .filter(Order.created_at >= start)
+                .group_by(OrderItem.product_id, Product.name)
+                .all()
+            )
+        finally:
+            db.close()
+
+        with self._lock:
+            self._reset(start.date())
+            for seller_id, name, orders, revenue in sellers:
+                if seller_id is not None:
+                    self._seller_names[seller_id] = name or NO_SELLER
+                self.sellers[seller_id] = {
+                    "seller_id": seller_id,
+                    "seller": name or NO_SELLER,
+                    "orders": int(orders),
+                    "revenue": float(revenue),
+                }
+                self.orders += int(orders)
+                self.revenue += float(revenue)
+            for payment, orders, revenue in payments:
+                self.payments[payment] = {"orders": int(orders), "revenue": float(revenue)}
+            for product_id, name, qty, revenue in products:
+                self._names[product_id] = name
+                self.products[product_id] = {
+                    "product_id": product_id,
+                    "name": name,
+                    "qty": int(qty or 0),
+                    "revenue": float(revenue or 0.0),
+                }
+                self._bump_top(product_id)
+
+    # ---------- atualização ----------
+    def _bump_top(self, product_id: int):
+        revenue = self.products[product_id]["revenue"]
+
+        if product_id in self.top or len(self.top) < self.top_k:
+            self.top[product_id] = revenue
+            return
+
+        lowest = min(self.top, key=self.top.get)
+        if revenue > self.top[lowest]:
+            del self.top[lowest]
+            self.top[product_id] = revenue
+
+    def _product_name(self, product_id: int) -> str:
+        name = self._names.get(product_id)
+        if name is None:
+            db = SessionLocal()
+            try:
+                name = db.query(Product.name).filter(Product.id == product_id).scalar() or ""
+            finally:
+                db.close()
+            self._names[product_id] = name
+        return name
+
+    def _seller_name(self, seller_id: int | None) -> str:
+        # nome atual do cadastro, como no ranking do /reports/summary (não o
+        # nome gravado na venda); sem vendedora ou vendedora apagada: NO_SELLER
+        if seller_id is None:
+            return NO_SELLER
+        name = self._seller_names.get(seller_id)
+        if name is None:
+            db = SessionLocal()
+            try:
+                name = db.query(Seller.name).filter(Seller.id == seller_id).scalar() or NO_SELLER
+            finally:
+                db.close()
+            self._seller_names[seller_id] = name
+        return name
+
+    def rename_seller(self, seller_id: int, name: str):
+        """Chamado pela edição de vendedora: o ranking do dia passa a usar o nome novo."""
+        with self._lock:
+            self._seller_names[seller_id] = name
+            if seller_id in self.sellers:
+                self.sellers[seller_id]["seller"] = name
+
+    def _top_products(self) -> list[dict]:
+        return sorted(
+            (dict(self.products[pid]) for pid in self.top),
+            key=lambda p: p["revenue"],
+            reverse=True,
+        )
+
+    def record(self, event: OrderEvent):
+        names = {it["product_id"]: self._product_name(it["product_id"]) for it in event.items}
+        seller_name = self._seller_name(event.seller_id)
+
+        with self._lock:
+            if date.today() != self.day:
+                self._reset(date.today())
+
+            self.revenue += event.total
+            self.orders += 1
+
+            seller = self.sellers.setdefault(event.seller_id, {
+                "seller_id": event.seller_id,
+                "seller": seller_name,
+                "orders": 0,
+                "revenue": 0.0,
+            })
+            seller["orders"] += 1
+            seller["revenue"] += event.total
+
+            payment = self.payments.setdefault(event.payment, {"orders": 0, "revenue": 0.0})
+            payment["orders"] += 1
+            payment["revenue"] += event.total
+
+            for it in event.items:
+                pid = it["product_id"]
+                product = self.products.setdefault(pid, {
+                    "product_id": pid,
+                    "name": names[pid],
+                    "qty": 0,
+                    "revenue": 0.0,
+                })
+                product["qty"] += int(it["quantity"])
+                product["revenue"] += float(it["price"]) * int(it["quantity"])
+                self._bump_top(pid)
+
+            delta = {
+                "order_id": event.id,
+                "total": event.total,
+                "revenue_today": self.revenue,
+                "orders_today": self.orders,
+                "seller": dict(seller),
+                "payment": {"payment": event.payment, **payment},
+                "top_products": self._top_products(),
+            }
+
+        self._publish("order", delta)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if date.today() != self.day:
+                self._reset(date.today())
+            return {
+                "day": self.day.isoformat(),
+                "revenue_today": self.revenue,
+                "orders_today": self.orders,
+                "sellers": sorted(
+                    (dict(s) for s in self.sellers.values()),
+                    key=lambda s: s["revenue"],
+                    reverse=True,
+                ),
+                "payments": {k: dict(v) for k, v in self.payments.items()},
+                "top_products": self._top_products(),
+            }
+
+    # ---------- SSE ----------
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def _publish(self, kind: str, data: dict):
+        message = f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:
+                # loop já foi fechado
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: str):
+        # cliente lento: descarta o delta em vez de crescer a fila
+        if not queue.full():
+            queue.put_nowait(message)
+
+
+live_kpis = LiveKpis()
+
+
+@on_order_committed
+def _record_order(event: OrderEvent):
+    live_kpis.record(event)
@@ -0,0 +1,70 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from db.database import SessionLocal, engine
+from models.notification import Notification
+from models.user import User
+from routes.auth import SESSIONS
+
+# =====================================
+# JOBS DE MANUTENÇÃO (rodados pelo scheduler)
+# =====================================
+
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "30"))
+
+
+def prune_sessions() -> int:
+    """Derruba sessões de usuários removidos, inativos ou bloqueados."""
+    user_ids = set(SESSIONS.values())
+    if not user_ids:
+        return 0
+
+    db = SessionLocal()
+    try:
+        valid = {
+            uid
+            for (uid,) in db.query(User.id).filter(
+                User.id.in_(user_ids),
+                User.is_active == True,
+                User.is_locked == False,
+            )
+        }
+    finally:
+        db.close()
+
+    removed = 0
+    for token, uid in list(SESSIONS.items()):
+        if uid not in valid:
+            SESSIONS.pop(token, None)
+            removed += 1
+    return removed
+
+
+def cleanup_notifications(days: int = NOTIFICATION_RETENTION_DAYS) -> int:
+    """Apaga notificações lidas mais velhas que `days`."""
+    cutoff = datetime.now() - timedelta(days=days)
+
+    db = SessionLocal()
+    try:
+        removed = (
+            db.query(Notification)
+            .filter(Notification.read == True, Notification.created_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return removed
+    finally:
+        db.close()
+
+
+def optimize_db():
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA optimize"))
+
+
+def vacuum_db():
+    # VACUUM não roda dentro de transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
@@ -0,0 +1,53 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+# =====================================
+# HOOKS PÓS-COMMIT DE VENDA
+# =====================================
+# create_order chama run_order_hooks() depois do commit. Os hooks recebem
+# um retrato simples da venda (sem objetos ORM) e nunca derrubam o
+# checkout: erro em hook só vai para o log.
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    id: int
+    total: float
+    seller_id: int | None
+    seller: str | None
+    payment: str
+    created_at: datetime | None
+    # [{"product_id", "quantity", "price"}]
+    items: list[dict] = field(default_factory=list)
+
+
+_HOOKS: list[Callable[[OrderEvent], None]] = []
+
+
+def on_order_committed(fn: Callable[[OrderEvent], None]):
+    _HOOKS.append(fn)
+    return fn
+
+
+def order_event(db_order, items: list[dict]) -> OrderEvent:
+    return OrderEvent(
+        id=db_order.id,
+        total=float(db_order.total),
+        seller_id=db_order.seller_id,
+        seller=db_order.seller,
+        payment=db_order.payment,
+        created_at=db_order.created_at,
+        items=[dict(it) for it in items],
+    )
+
+
+def run_order_hooks(event: OrderEvent):
+    for fn in _HOOKS:
+        try:
+            fn(event)
+        except Exception:
+            logger.exception("hook pós-venda %s falhou", getattr(fn, "__name__", fn))
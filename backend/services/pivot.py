@@ -0,0 +1,316 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+from db.database import SessionLocal
+from models.product import Product
+from models.seller import Seller
+
+# =====================================
+# PIVÔ COLUNAR DE VENDAS (análise ad-hoc)
+# =====================================
+# Guarda order_items (+ atributos do pedido) como arrays NumPy, um
+# elemento por item vendido. Vendedora, pagamento e produto ficam
+# codificados por dicionário (código denso -> id/valor), então qualquer
+# corte (vendedora x pagamento x dia da semana, produto x hora ...) é um
+# group-by vetorizado com bincount, sem SQL novo por relatório.
+#
+# Os arrays crescem por append: cada consulta busca só os pedidos com
+# id maior que o último carregado (inclusive do arquivo frio, via
+# all_orders / all_order_items).
+#
+# created_at é gravado pelo CURRENT_TIMESTAMP do SQLite, em UTC: "ts" é
+# o epoch direto dele e serve para os limites de data (meia-noite local
+# convertida); "wall" é a hora de parede local (modificador 'localtime',
+# fuso do processo) e serve para os cortes por dia / hora / dia da
+# semana / mês.
+
+DIMENSIONS = ("seller", "payment", "product", "weekday", "hour", "day", "month")
+MEASURES = ("revenue", "net_revenue", "qty", "items", "orders")
+WEEKDAYS = ["seg", "ter", "qua", "qui", "sex", "sáb", "dom"]
+
+_COLUMNS = {
+    "order_id": np.int64,
+    "ts": np.int64,  # epoch (segundos)
+    "wall": np.int64,  # hora local de parede, em segundos desde 1970-01-01 00:00
+    "seller": np.int32,  # código denso
+    "payment": np.int16,  # código denso
+    "product": np.int32,  # código denso
+    "qty": np.int64,
+    "revenue": np.float64,  # preço x qtd
+    "net_revenue": np.float64,  # receita com o desconto do pedido rateado
+}
+
+_INGEST_SQL = """
+    SELECT i.order_id,
+           coalesce(CAST(strftime('%s', o.created_at) AS INTEGER), 0),
+           coalesce(CAST(strftime('%s', o.created_at, 'localtime') AS INTEGER), 0),
+           o.seller_id,
+           o.payment,
+           i.product_id,
+           i.quantity,
+           i.price * i.quantity,
+           o.total
+    FROM all_orders o
+    JOIN all_order_items i ON i.order_id = o.id
+    WHERE o.id > :last_id
+    ORDER BY o.id
+"""
+
+
+class _Dictionary:
+    """Valor original <-> código denso (0..n-1)."""
+
+    def __init__(self):
+        self.codes: dict = {}
+        self.values: list = []
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class PivotEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._size = 0
+        self._cols = {name: np.empty(0, dtype=dt) for name, dt in _COLUMNS.items()}
+        self.sellers = _Dictionary()  # seller_id (None = sem vendedora)
+        self.payments = _Dictionary()
+        self.products = _Dictionary()  # product_id
+        self.last_order_id = 0
+
+    # ---------- carga incremental ----------
+    def _append(self, new: dict[str, np.ndarray]):
+        n = len(new["order_id"])
+        needed = self._size + n
+        capacity = len(self._cols["order_id"])
+
+        if needed > capacity:
+            # cresce dobrando: append amortizado O(1)
+            capacity = max(needed, capacity * 2, 1024)
+            for name, arr in self._cols.items():
+                grown = np.empty(capacity, dtype=arr.dtype)
+                grown[: self._size] = arr[: self._size]
+                self._cols[name] = grown
+
+        for name, arr in new.items():
+            self._cols[name][self._size:needed] = arr
+        self._size = needed
+
+    def refresh(self) -> int:
+        """Carrega os itens dos pedidos novos. Retorna quantas linhas entraram."""
+        with self._lock:
+            db = SessionLocal()
+            try:
+                rows = db.execute(text(_INGEST_SQL), {"last_id": self.last_order_id}).all()
+            finally:
+                db.close()
+
+            if not rows:
+                return 0
+
+            order_id, ts, wall, seller_id, payment, product_id, qty, revenue, total = zip(*rows)
+
+            order_id = np.asarray(order_id, dtype=np.int64)
+            revenue = np.asarray(revenue, dtype=np.float64)
+            total = np.asarray(total, dtype=np.float64)
+
+            # rateio do desconto: receita do item x (total do pedido / subtotal)
+            _, inverse = np.unique(order_id, return_inverse=True)
+            subtotal = np.bincount(inverse, weights=revenue)[inverse]
+            factor = np.divide(total, subtotal, out=np.ones_like(total), where=subtotal > 0)
+
+            self._append({
+                "order_id": order_id,
+                "ts": np.asarray(ts, dtype=np.int64),
+                "wall": np.asarray(wall, dtype=np.int64),
+                "seller": np.fromiter((self.sellers.encode(s) for s in seller_id), np.int32, len(rows)),
+                "payment": np.fromiter((self.payments.encode(p) for p in payment), np.int16, len(rows)),
+                "product": np.fromiter((self.products.encode(p) for p in product_id), np.int32, len(rows)),
+                "qty": np.asarray(qty, dtype=np.int64),
+                "revenue": revenue,
+                "net_revenue": revenue * factor,
+            })
+            self.last_order_id = int(order_id.max())
+            return len(rows)
+
+    # ---------- consulta ----------
+    def _dimension(self, name: str, cols: dict) -> tuple[np.ndarray, int | None]:
+        """Códigos da dimensão e cardinalidade (None = densificar com unique)."""
+        if name in ("seller", "payment", "product"):
+            return cols[name].astype(np.int64), len(getattr(self, name + "s"))
+        days = cols["wall"] // 86400
+        if name == "weekday":
+            return (days + 3) % 7, 7  # 1970-01-01 foi quinta
+        if name == "hour":
+            return (cols["wall"] % 86400) // 3600, 24
+        if name == "day":
+            return days, None
+        # month
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64), None
+
+    def _label(self, name: str, code: int, names: dict):
+        if name == "seller":
+            seller_id = self.sellers.values[code]
+            return {"seller_id": seller_id, "seller": names["seller"].get(seller_id, "Sem vendedora")}
+        if name == "payment":
+            return {"payment": self.payments.values[code]}
+        if name == "product":
+            product_id = self.products.values[code]
+            return {"product_id": product_id, "product": names["product"].get(product_id, "")}
+        if name == "weekday":
+            return {"weekday": WEEKDAYS[code]}
+        if name == "hour":
+            return {"hour": code}
+        if name == "day":
+            return {"day": str(np.datetime64(code, "D"))}
+        return {"month": str(np.datetime64(code, "M"))}
+
+    def _mask(self, cols: dict, filters: dict, date_from: date | None, date_to: date | None):
+        mask = np.ones(self._size, dtype=bool)
+
+        # meia-noite local, como o datetime(date_from...) do /reports/summary
+        if date_from:
+            start = datetime(date_from.year, date_from.month, date_from.day)
+            mask &= cols["ts"] >= int(start.timestamp())
+        if date_to:
+            end = datetime(date_to.year, date_to.month, date_to.day) + timedelta(days=1)
+            mask &= cols["ts"] < int(end.timestamp())
+
+        lookups = {"seller_id": self.sellers, "payment": self.payments, "product_id": self.products}
+        for key, values in filters.items():
+            if not values:
+                continue
+            if key in lookups:
+                wanted = [lookups[key].codes[v] for v in values if v in lookups[key].codes]
+                column = cols[{"seller_id": "seller", "product_id": "product"}.get(key, key)]
+                mask &= np.isin(column, wanted)
+            elif key in ("weekday", "hour"):
+                codes, _ = self._dimension(key, cols)
+                mask &= np.isin(codes, values)
+        return mask
+
+    def pivot(
+        self,
+        dimensions: list[str],
+        measures: list[str],
+        filters: dict | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        limit: int = 1000,
+    ) -> dict:
+        started = time.perf_counter()
+        loaded = self.refresh()
+
+        with self._lock:
+            cols = {name: arr[: self._size] for name, arr in self._cols.items()}
+            mask = self._mask(cols, filters or {}, date_from, date_to)
+            cols = {name: arr[mask] for name, arr in cols.items()}
+            n = len(cols["order_id"])
+
+            if not n:
+                # nada casou com os filtros: sem grupos (e sem chave para desfazer)
+                return self._result(dimensions, measures, [], loaded, started)
+
+            # chave combinada das dimensões -> grupo denso
+            if dimensions:
+                parts, sizes = [], []
+                for name in dimensions:
+                    codes, size = self._dimension(name, cols)
+                    if size is None:
+                        uniq, codes = np.unique(codes, return_inverse=True)
+                        parts.append((uniq, codes))
+                        size = len(uniq)
+                    else:
+                        parts.append((None, codes))
+                    sizes.append(max(size, 1))
+                combined = np.ravel_multi_index([p[1] for p in parts], sizes)
+                keys, group = np.unique(combined, return_inverse=True)
+            else:
+                parts, sizes = [], []
+                keys, group = np.zeros(1, dtype=np.int64), np.zeros(n, dtype=np.int64)
+
+            n_groups = len(keys)
+            values = {}
+            for m in measures:
+                if m in ("revenue", "net_revenue", "qty"):
+                    values[m] = np.bincount(group, weights=cols[m], minlength=n_groups)
+                elif m == "items":
+                    values[m] = np.bincount(group, minlength=n_groups).astype(np.float64)
+                elif m == "orders":
+                    values[m] = self._distinct_orders(group, cols["order_id"], n_groups)
+
+            order = np.argsort(-values[measures[0]], kind="stable") if measures else np.arange(n_groups)
+            order = order[:limit]
+
+            decoded = []
+            if dimensions:
+                unravelled = np.unravel_index(keys[order], sizes)
+                for (uniq, _), codes in zip(parts, unravelled):
+                    decoded.append(uniq[codes] if uniq is not None else codes)
+
+        names = self._names(dimensions)
+        rows = []
+        for pos, g in enumerate(order):
+            row = {}
+            for name, codes in zip(dimensions, decoded):
+                row.update(self._label(name, int(codes[pos]), names))
+            for m in measures:
+                v = values[m][g]
+                row[m] = int(v) if m in ("qty", "items", "orders") else round(float(v), 2)
+            rows.append(row)
+
+        return self._result(dimensions, measures, rows, loaded, started)
+
+    def _result(self, dimensions: list[str], measures: list[str], rows: list[dict], loaded: int, started: float) -> dict:
+        return {
+            "dimensions": dimensions,
+            "measures": measures,
+            "rows": rows,
+            "total_rows": self._size,
+            "loaded_rows": loaded,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    @staticmethod
+    def _distinct_orders(group: np.ndarray, order_id: np.ndarray, n_groups: int) -> np.ndarray:
+        """Pedidos distintos por grupo (um pedido tem vários itens)."""
+        if not len(order_id):
+            return np.zeros(n_groups)
+
+        base = int(order_id.max()) + 1
+        if n_groups * base < 2**62:
+            # (grupo, pedido) numa chave int64 só: unique 1-D é bem mais rápido
+            pairs = np.unique(group * base + order_id) // base
+        else:
+            pairs = np.unique(np.stack([group, order_id]), axis=1)[0]
+        return np.bincount(pairs, minlength=n_groups).astype(np.float64)
+
+    def _names(self, dimensions: list[str]) -> dict:
+        names = {"seller": {}, "product": {}}
+        if "seller" not in dimensions and "product" not in dimensions:
+            return names
+
+        db = SessionLocal()
+        try:
+            if "seller" in dimensions:
+                names["seller"] = dict(db.query(Seller.id, Seller.name).all())
+            if "product" in dimensions:
+                names["product"] = dict(db.query(Product.id, Product.name).all())
+        finally:
+            db.close()
+        return names
+
+
+pivot_engine = PivotEngine()
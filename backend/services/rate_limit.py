@@ -0,0 +1,153 @@
+import ipaddress
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# =====================================
+# RATE LIMIT (token bucket em memória)
+# =====================================
+# Cada tentativa de login custa um PBKDF2 inteiro; o limitador recusa
+# antes de qualquer hash ou consulta ao banco.
+#
+# Atrás de proxy (Render, nginx) todo cliente chega com o IP do proxy e
+# um balde por IP viraria um só para a loja inteira: 10 senhas erradas de
+# qualquer um travariam todos os caixas. Duas saídas:
+#   - AUTH_TRUSTED_PROXIES=10.0.0.0/8,127.0.0.1: quando a conexão vem
+#     de um desses, o IP do cliente é o último endereço do
+#     X-Forwarded-For que não é proxy confiável. "*" confia em qualquer
+#     conexão direta e usa o último endereço (um proxy só, como no Render);
+#   - ou rodar o uvicorn com --proxy-headers --forwarded-allow-ips="*",
+#     que já troca request.client pelo cliente de verdade.
+# Sem nenhum dos dois e atrás de proxy, desligue o balde por IP com
+# AUTH_IP_LIMIT=0 (o balde por e-mail continua).
+
+
+class TokenBucketLimiter:
+    def __init__(self, name: str, capacity: int, per_minute: float, max_keys: int = 10_000):
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = per_minute / 60.0  # tokens por segundo
+        self.max_keys = max_keys
+
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: str) -> int:
+        """Consome um token. Retorna 0 se liberado, senão os segundos de espera."""
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+                # limita memória: descarta as chaves mais antigas
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                self.allowed += 1
+                return 0
+
+            bucket[0] = tokens
+            self.rejected += 1
+
+            if self.rate <= 0:
+                return 60
+            return max(1, math.ceil((1 - tokens) / self.rate))
+
+    def reset(self, key: str):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": int(self.capacity),
+                "per_minute": self.rate * 60.0,
+                "tracked_keys": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+            }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _trusted_proxies(value: str):
+    if value.strip() == "*":
+        return "*"
+    return [ipaddress.ip_network(v.strip(), strict=False) for v in value.split(",") if v.strip()]
+
+
+TRUSTED_PROXIES = _trusted_proxies(os.getenv("AUTH_TRUSTED_PROXIES", ""))
+IP_LIMIT_ENABLED = os.getenv("AUTH_IP_LIMIT", "1") == "1"
+
+
+def _is_trusted(host: str, direct: bool = False) -> bool:
+    if TRUSTED_PROXIES == "*":
+        # "*": só a conexão direta é proxy (um salto na frente do app)
+        return direct
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in net for net in TRUSTED_PROXIES)
+
+
+def client_ip(peer: str | None, forwarded_for: str | None) -> str:
+    """IP do cliente para o balde: o peer, ou o X-Forwarded-For se o peer é proxy confiável."""
+    if not peer:
+        return "unknown"
+    if not forwarded_for or not _is_trusted(peer, direct=True):
+        return peer
+
+    # da direita para a esquerda: cada proxy confiável acrescenta quem o chamou
+    hops = [h.strip() for h in forwarded_for.split(",") if h.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+# por IP: segura scripts batendo em vários e-mails
+login_ip_limiter = TokenBucketLimiter(
+    "login_ip",
+    capacity=_env_int("AUTH_IP_BURST", 10),
+    per_minute=_env_int("AUTH_IP_PER_MINUTE", 10),
+)
+
+# por e-mail: segura tentativa distribuída contra uma conta
+login_email_limiter = TokenBucketLimiter(
+    "login_email",
+    capacity=_env_int("AUTH_EMAIL_BURST", 5),
+    per_minute=_env_int("AUTH_EMAIL_PER_MINUTE", 5),
+)
+
+# troca de senha também gera hash: por sessão/usuário
+password_change_limiter = TokenBucketLimiter(
+    "change_password",
+    capacity=_env_int("AUTH_PASSWORD_BURST", 5),
+    per_minute=_env_int("AUTH_PASSWORD_PER_MINUTE", 5),
+)
+
+LIMITERS = [login_ip_limiter, login_email_limiter, password_change_limiter]
+
+
+def limiter_stats() -> dict:
+    return {lim.name: lim.stats() for lim in LIMITERS}
@@ -0,0 +1,311 @@
+import argparse
+import logging
+import threading
+from collections import Counter, defaultdict
+from itertools import combinations, groupby
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, aliased
+
+from db.database import SessionLocal, engine
+from models.product import Product
+from models.product_pair import ProductPair
+from models.product_related import ProductRelated
+from models.related_state import RelatedState
+from services.order_hooks import OrderEvent, on_order_committed
+
+# =====================================
+# "COMPRADOS JUNTOS" (co-ocorrência de produtos)
+# =====================================
+# product_pairs é a matriz esparsa de co-ocorrência por pedido e
+# product_related guarda o top-k já calculado de cada produto, então o
+# GET /products/{id}/related lê no máximo 2k linhas pela PK, não importa
+# o tamanho do histórico.
+#
+# Atualização incremental: depois do commit de cada venda um hook acorda
+# uma thread que lê os itens dos pedidos com id acima da marca d'água
+# (related_state.last_order_id), soma os pares e recalcula o top-k só dos
+# produtos desses pedidos. A marca d'água avança com UPDATE condicional,
+# então dois workers nunca contam o mesmo pedido duas vezes; vendas de
+# outro worker entram no próximo ciclo. O lift dos produtos que não
+# venderam de novo envelhece devagar (depende do total de pedidos); a
+# reconstrução diária corrige (e faz a primeira carga, na subida, se o
+# índice ainda não existe). Reconstrução completa manual:
+#     python -m services.related --rebuild
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 10
+MIN_PAIR_ORDERS = 2  # lift com 1 pedido só é ruído
+MAX_ROWS = 100_000  # itens lidos por ciclo incremental
+
+_ITEMS_SQL = """
+    SELECT order_id, product_id
+    FROM {table}
+    WHERE order_id > :last_id
+    ORDER BY order_id
+"""
+
+
+def _baskets(rows):
+    """(order_id, product_id) ordenados -> produtos distintos de cada pedido."""
+    for order_id, group in groupby(rows, key=lambda r: r[0]):
+        yield order_id, sorted({product_id for _, product_id in group})
+
+
+def _count_pairs(baskets) -> tuple[Counter, int, int]:
+    pairs: Counter = Counter()
+    orders = 0
+    last_id = 0
+    for order_id, products in baskets:
+        orders += 1
+        last_id = order_id
+        for product_id in products:
+            pairs[(product_id, product_id)] += 1
+        for a, b in combinations(products, 2):
+            pairs[(a, b)] += 1
+            pairs[(b, a)] += 1
+    return pairs, orders, last_id
+
+
+class RelatedIndex:
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._worker: threading.Thread | None = None
+
+    # ---------- top-k ----------
+    def _top(self, product_id: int, n_product: int, neighbours, total_orders: int) -> list[dict]:
+        """neighbours: (related_id, pedidos juntos, pedidos do related)."""
+        scored = [
+            {
+                "product_id": product_id,
+                "related_id": related_id,
+                "orders": together,
+                "confidence": together / n_product,
+                "lift": together * total_orders / (n_product * n_related),
+            }
+            for related_id, together, n_related in neighbours
+        ]
+        by_confidence = sorted(scored, key=lambda e: (e["confidence"], e["orders"], -e["related_id"]), reverse=True)
+        by_lift = sorted(
+            (e for e in scored if e["orders"] >= MIN_PAIR_ORDERS),
+            key=lambda e: (e["lift"], e["orders"], -e["related_id"]),
+            reverse=True,
+        )
+        kept = {e["related_id"]: e for e in by_confidence[: self.top_k] + by_lift[: self.top_k]}
+        return list(kept.values())
+
+    def _recompute(self, db: Session, product_ids, total_orders: int):
+        if not product_ids:
+            return
+
+        own = aliased(ProductPair)
+        other = aliased(ProductPair)
+        rows = db.execute(
+            select(ProductPair.product_id, ProductPair.related_id, ProductPair.orders, own.orders, other.orders)
+            .join(own, (own.product_id == ProductPair.product_id) & (own.related_id == ProductPair.product_id))
+            .join(other, (other.product_id == ProductPair.related_id) & (other.related_id == ProductPair.related_id))
+            .where(ProductPair.product_id.in_(product_ids))
+            .where(ProductPair.related_id != ProductPair.product_id)
+            .order_by(ProductPair.product_id)
+        ).all()
+
+        db.execute(delete(ProductRelated).where(ProductRelated.product_id.in_(product_ids)))
+
+        entries = []
+        for product_id, group in groupby(rows, key=lambda r: r[0]):
+            group = list(group)
+            n_product = group[0][3]
+            entries.extend(self._top(product_id, n_product, [(r[1], r[2], r[4]) for r in group], total_orders))
+
+        if entries:
+            db.execute(insert(ProductRelated), entries)
+
+    # ---------- incremental ----------
+    def update(self) -> int:
+        """Conta os pedidos novos desde a marca d'água. Retorna quantos entraram."""
+        db = SessionLocal()
+        try:
+            state = db.get(RelatedState, 1)
+            if state is None:
+                # índice ainda não construído: fica para o related_rebuild
+                # (job ou CLI), nunca no caminho de uma venda
+                return 0
+
+            rows = db.execute(
+                text(_ITEMS_SQL.format(table="order_items") + " LIMIT :limit"),
+                {"last_id": state.last_order_id, "limit": MAX_ROWS},
+            ).all()
+            if not rows:
+                return 0
+
+            # o LIMIT pode cortar o último pedido no meio: fica para o próximo ciclo
+            last_id = rows[-1][0]
+            if len(rows) == MAX_ROWS and rows[0][0] != last_id:
+                rows = [r for r in rows if r[0] != last_id]
+
+            pairs, orders, last_id = _count_pairs(_baskets(rows))
+            previous = state.last_order_id
+            total_orders = state.orders + orders
+
+            moved = db.execute(
+                update(RelatedState)
+                .where(RelatedState.id == 1, RelatedState.last_order_id == previous)
+                .values(last_order_id=last_id, orders=total_orders)
+            ).rowcount
+            if not moved:
+                # outro worker já contou estes pedidos
+                db.rollback()
+                return 0
+
+            stmt = insert(ProductPair)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[ProductPair.product_id, ProductPair.related_id],
+                    set_={"orders": ProductPair.orders + stmt.excluded.orders},
+                ),
+                [{"product_id": a, "related_id": b, "orders": n} for (a, b), n in pairs.items()],
+            )
+            self._recompute(db, sorted({a for a, b in pairs if a == b}), total_orders)
+            db.commit()
+            return orders
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._dirty:
+                    self._worker = None
+                    return
+                self._dirty = False
+            try:
+                self.update()
+            except Exception:
+                logger.exception("atualização do índice de comprados juntos falhou")
+
+    def request_update(self):
+        """Agenda update() numa thread (coalescendo vendas em rajada)."""
+        with self._lock:
+            self._dirty = True
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._drain, name="onmauri-related", daemon=True)
+            self._worker.start()
+
+    # ---------- reconstrução ----------
+    def rebuild(self) -> int:
+        """Recalcula tudo a partir de todo o histórico (inclusive arquivo)."""
+        with engine.connect() as conn:
+            # .all() solta o lock de leitura antes da contagem em Python
+            rows = conn.execute(text(_ITEMS_SQL.format(table="all_order_items")), {"last_id": 0}).all()
+            pairs, orders, last_id = _count_pairs(_baskets(rows))
+            del rows
+
+            n_orders = {a: n for (a, b), n in pairs.items() if a == b}
+            neighbours = defaultdict(list)
+            for (a, b), n in pairs.items():
+                if a != b:
+                    neighbours[a].append((b, n, n_orders[b]))
+            entries = []
+            for product_id, candidates in neighbours.items():
+                entries.extend(self._top(product_id, n_orders[product_id], candidates, orders))
+
+            # monta tudo em tabelas TEMP (não travam o banco principal); a
+            # transação que trava o checkout fica só com a cópia final
+            conn.execute(text("CREATE TEMP TABLE stage_pairs AS SELECT * FROM product_pairs WHERE 0"))
+            conn.execute(text("CREATE TEMP TABLE stage_related AS SELECT * FROM product_related WHERE 0"))
+            try:
+                if pairs:
+                    conn.execute(
+                        text("INSERT INTO stage_pairs (product_id, related_id, orders) VALUES (:a, :b, :n)"),
+                        [{"a": a, "b": b, "n": n} for (a, b), n in pairs.items()],
+                    )
+                if entries:
+                    conn.execute(
+                        text(
+                            "INSERT INTO stage_related (product_id, related_id, orders, confidence, lift) "
+                            "VALUES (:product_id, :related_id, :orders, :confidence, :lift)"
+                        ),
+                        entries,
+                    )
+                conn.commit()
+
+                conn.execute(delete(ProductPair))
+                conn.execute(delete(ProductRelated))
+                conn.execute(delete(RelatedState))
+                conn.execute(text("INSERT INTO product_pairs SELECT * FROM stage_pairs"))
+                conn.execute(text("INSERT INTO product_related SELECT * FROM stage_related"))
+                conn.execute(insert(RelatedState).values(id=1, last_order_id=last_id, orders=orders))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute(text("DROP TABLE IF EXISTS temp.stage_pairs"))
+                conn.execute(text("DROP TABLE IF EXISTS temp.stage_related"))
+                conn.commit()
+            return orders
+
+    def built(self) -> bool:
+        db = SessionLocal()
+        try:
+            return db.get(RelatedState, 1) is not None
+        finally:
+            db.close()
+
+    # ---------- consulta ----------
+    def related(self, db: Session, product_id: int, by: str = "confidence", limit: int = 5) -> list[dict]:
+        metric = ProductRelated.lift if by == "lift" else ProductRelated.confidence
+        rows = (
+            db.query(
+                ProductRelated.related_id,
+                Product.name,
+                Product.price,
+                ProductRelated.orders,
+                ProductRelated.confidence,
+                ProductRelated.lift,
+            )
+            .join(Product, Product.id == ProductRelated.related_id)
+            .filter(ProductRelated.product_id == product_id, Product.active == True)
+            .order_by(metric.desc(), ProductRelated.orders.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                "product_id": related_id,
+                "name": name,
+                "price": price,
+                "orders": orders,
+                "confidence": round(confidence, 4),
+                "lift": round(lift, 4),
+            }
+            for related_id, name, price, orders, confidence, lift in rows
+        ]
+
+
+related_index = RelatedIndex()
+
+
+@on_order_committed
+def _count_order(event: OrderEvent):
+    related_index.request_update()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de produtos comprados juntos")
+    parser.add_argument("--rebuild", action="store_true", help="recalcula a partir de todo o histórico")
+    args = parser.parse_args()
+
+    from db.init_db import init_db
+
+    init_db()
+
+    print(related_index.rebuild() if args.rebuild else related_index.update())
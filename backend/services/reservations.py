@@ -0,0 +1,209 @@
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from models.product import Product
+from services.catalog import next_change_seq
+
+# =====================================
+# RESERVAS DE ESTOQUE (carrinhos abertos)
+# =====================================
+# A tabela de reservas fica em memória; o banco guarda só o total
+# reservado por produto (products.reserved). Toda reserva passa por um
+# UPDATE condicional (stock - reserved >= qtd), então duas vendedoras
+# nunca conseguem segurar a mesma última unidade. Reservar e liberar
+# também avançam change_seq: o disponível (stock - reserved) faz parte
+# do catálogo que os terminais sincronizam por delta.
+
+HOLD_TTL_SECONDS = 10 * 60
+SWEEP_INTERVAL_SECONDS = 30
+LOCK_STRIPES = 32
+
+
+class ReservationError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class Cart:
+    id: str
+    expires_at: float
+    items: dict[int, int] = field(default_factory=dict)
+
+
+class ReservationTable:
+    def __init__(self, ttl: float = HOLD_TTL_SECONDS, stripes: int = LOCK_STRIPES):
+        self.ttl = ttl
+        self._carts: dict[str, Cart] = {}
+        self._carts_lock = threading.Lock()
+        # um lock por faixa de produto: carrinhos com produtos diferentes
+        # não disputam o mesmo lock
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._next_sweep = 0.0
+
+    def _stripe(self, product_id: int) -> threading.Lock:
+        return self._stripes[product_id % len(self._stripes)]
+
+    def _get(self, cart_id: str) -> Cart:
+        with self._carts_lock:
+            cart = self._carts.get(cart_id)
+
+        if not cart or cart.expires_at <= time.monotonic():
+            raise ReservationError(404, "Carrinho não encontrado ou expirado")
+
+        return cart
+
+    @staticmethod
+    def _release(db: Session, product_id: int, quantity: int):
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(reserved=Product.reserved - quantity, change_seq=next_change_seq())
+        )
+
+    # ---------- carrinho ----------
+    def open_cart(self) -> Cart:
+        self.maybe_sweep()
+
+        cart = Cart(id=str(uuid.uuid4()), expires_at=time.monotonic() + self.ttl)
+        with self._carts_lock:
+            self._carts[cart.id] = cart
+        return cart
+
+    def get_cart(self, cart_id: str) -> Cart:
+        return self._get(cart_id)
+
+    def set_hold(self, db: Session, cart_id: str, product_id: int, quantity: int) -> Cart:
+        self.maybe_sweep()
+        cart = self._get(cart_id)
+
+        with self._stripe(product_id):
+            current = cart.items.get(product_id, 0)
+            delta = quantity - current
+
+            if delta > 0:
+                result = db.execute(
+                    update(Product)
+                    .where(
+                        Product.id == product_id,
+                        Product.active == True,
+                        Product.stock - Product.reserved >= delta,
+                    )
+                    .values(reserved=Product.reserved + delta, change_seq=next_change_seq())
+                )
+
+                if result.rowcount == 0:
+                    db.rollback()
+                    product = db.query(Product).filter(
+                        Product.id == product_id,
+                        Product.active == True,
+                    ).first()
+                    if not product:
+                        raise ReservationError(404, "Produto não encontrado")
+                    raise ReservationError(400, f"Estoque insuficiente para {product.name}")
+
+            elif delta < 0:
+                self._release(db, product_id, -delta)
+
+            db.commit()
+
+            # checkout (claim) ou varredura podem ter tirado o carrinho da
+            # tabela entre o _get e o commit; aí eles já liberaram/converteram
+            # cart.items sem este delta, então desfaz no banco
+            with self._carts_lock:
+                alive = self._carts.get(cart_id) is cart
+                if alive:
+                    if quantity > 0:
+                        cart.items[product_id] = quantity
+                    else:
+                        cart.items.pop(product_id, None)
+                    cart.expires_at = time.monotonic() + self.ttl
+
+            if not alive:
+                self._release(db, product_id, delta)
+                db.commit()
+                raise ReservationError(404, "Carrinho não encontrado ou expirado")
+
+        return cart
+
+    def release_cart(self, db: Session, cart_id: str):
+        with self._carts_lock:
+            cart = self._carts.pop(cart_id, None)
+
+        if not cart:
+            return
+
+        self._release_items(db, cart)
+
+    def _release_items(self, db: Session, cart: Cart):
+        # sem lock de faixa: o carrinho já saiu da tabela e o UPDATE é
+        # relativo. Pegar a faixa com a transação aberta travava contra o
+        # set_hold (faixa -> banco) até o timeout do SQLite.
+        for product_id, quantity in cart.items.items():
+            self._release(db, product_id, quantity)
+        db.commit()
+
+    # ---------- checkout ----------
+    def claim(self, cart_id: str) -> Cart:
+        """Tira o carrinho da tabela para o checkout converter as reservas.
+
+        Enquanto está fora da tabela a varredura não o enxerga, então a
+        reserva não pode ser liberada duas vezes.
+        """
+        with self._carts_lock:
+            cart = self._carts.pop(cart_id, None)
+
+        if not cart or cart.expires_at <= time.monotonic():
+            if cart:
+                # expirou mas a varredura ainda não passou
+                db = SessionLocal()
+                try:
+                    self._release_items(db, cart)
+                finally:
+                    db.close()
+            raise ReservationError(404, "Carrinho não encontrado ou expirado")
+
+        return cart
+
+    def restore(self, cart: Cart):
+        """Devolve à tabela um carrinho cujo checkout falhou."""
+        with self._carts_lock:
+            self._carts[cart.id] = cart
+
+    # ---------- expiração ----------
+    def sweep_expired(self) -> int:
+        now = time.monotonic()
+        with self._carts_lock:
+            expired = [c for c in self._carts.values() if c.expires_at <= now]
+            for cart in expired:
+                del self._carts[cart.id]
+
+        if not expired:
+            return 0
+
+        db = SessionLocal()
+        try:
+            for cart in expired:
+                self._release_items(db, cart)
+        finally:
+            db.close()
+
+        return len(expired)
+
+    def maybe_sweep(self):
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+        self.sweep_expired()
+
+
+reservations = ReservationTable()
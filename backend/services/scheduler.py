@@ -0,0 +1,235 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from db.database import engine
+
+# =====================================
+# AGENDADOR DE TAREFAS PERIÓDICAS
+# =====================================
+# Uma thread roda os jobs registrados no intervalo de cada um. Um job
+# que ainda está rodando não é disparado de novo.
+#
+# Com vários workers (uvicorn --workers N) há dois tipos de job:
+#   - do banco (padrão): arquivo, VACUUM, índices... rodam só no líder,
+#     o processo que segura o lock de arquivo .onmauri_job_leader.lock
+#     enquanto vive. Se ele morre o SO solta o lock e outro worker assume
+#     no próximo tick;
+#   - locais (local=True): mexem na memória do próprio processo
+#     (reservas, sessões, pivô) e rodam em todo worker, sem lock.
+#
+# Jobs pesados (VACUUM, arquivo) seguram o lock de escrita do SQLite por
+# mais que o busy timeout e derrubam checkouts: registrados com
+# window=MAINTENANCE_WINDOW, só disparam dentro da janela de hora local
+# (padrão 03:00-05:00, fora do horário da loja) depois de vencido o
+# intervalo.
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 1.0
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_window(value: str) -> tuple[int, int]:
+    """"HH:MM-HH:MM" -> (minuto inicial, minuto final) do dia; pode virar a meia-noite."""
+    start, end = value.split("-")
+    return _minutes(start), _minutes(end)
+
+
+def format_window(window: tuple[int, int]) -> str:
+    return "-".join(f"{m // 60:02d}:{m % 60:02d}" for m in window)
+
+
+def in_window(window: tuple[int, int], now: datetime) -> bool:
+    minute = now.hour * 60 + now.minute
+    start, end = window
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+MAINTENANCE_WINDOW = parse_window(os.getenv("MAINTENANCE_WINDOW", "03:00-05:00"))
+LOCK_DIR = os.path.dirname(os.path.abspath(engine.url.database or "onmauri.db"))
+
+
+class _FileLock:
+    def __init__(self, name: str):
+        self.path = os.path.join(LOCK_DIR, f".onmauri_job_{name}.lock")
+        self._fh = None
+
+    def acquire(self) -> bool:
+        fh = open(self.path, "a+")
+        try:
+            if fcntl:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            fh.close()
+            return False
+        self._fh = fh
+        return True
+
+    def release(self):
+        if not self._fh:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            else:
+                self._fh.seek(0)
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._fh.close()
+            self._fh = None
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    func: Callable[[], object]
+    local: bool = False
+    window: tuple[int, int] | None = None
+
+    next_run: float = 0.0
+    running: bool = False
+    runs: int = 0
+    skipped: int = 0
+    last_started_at: float | None = None
+    last_duration: float | None = None
+    last_status: str | None = None  # ok | error | follower
+    last_error: str | None = None
+    last_result: object = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "local": self.local,
+            "window": format_window(self.window) if self.window else None,
+            "running": self.running,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "last_started_at": self.last_started_at,
+            "last_duration": self.last_duration,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_result": self.last_result if isinstance(self.last_result, (int, float, str, dict, list)) else None,
+        }
+
+
+class Scheduler:
+    def __init__(self, tick: float = TICK_SECONDS):
+        self.tick = tick
+        self.jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._leader_lock = _FileLock("leader")
+        self.is_leader = False
+
+    def register(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], object],
+        run_at_start: bool = False,
+        local: bool = False,
+        window: tuple[int, int] | None = None,
+    ):
+        job = Job(name=name, interval=interval, func=func, local=local, window=window)
+        job.next_run = time.monotonic() + (0 if run_at_start else interval)
+        self.jobs[name] = job
+        return job
+
+    def _try_lead(self) -> bool:
+        # o lock fica preso enquanto o processo viver; não é solto entre jobs
+        if not self.is_leader and self._leader_lock.acquire():
+            self.is_leader = True
+            logger.info("agendador: este processo (pid %s) roda os jobs do banco", os.getpid())
+        return self.is_leader
+
+    def run_job(self, name: str) -> bool:
+        """Executa o job agora. Retorna False se foi pulado."""
+        job = self.jobs[name]
+
+        with self._lock:
+            if job.running:
+                job.skipped += 1
+                return False
+            job.running = True
+
+        try:
+            if not job.local and not self._try_lead():
+                # outro worker é o líder e roda os jobs do banco
+                job.last_status = "follower"
+                return False
+
+            job.last_started_at = time.time()
+            started = time.perf_counter()
+            try:
+                job.last_result = job.func()
+                job.last_status = "ok"
+                job.last_error = None
+            except Exception as e:
+                job.last_status = "error"
+                job.last_error = str(e)
+                logger.exception("job %s falhou", name)
+            finally:
+                job.last_duration = time.perf_counter() - started
+                job.runs += 1
+            return True
+        finally:
+            job.next_run = time.monotonic() + job.interval
+            with self._lock:
+                job.running = False
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            now = time.monotonic()
+            for job in list(self.jobs.values()):
+                if self._stop.is_set():
+                    break
+                if job.next_run > now:
+                    continue
+                if job.window and not in_window(job.window, datetime.now()):
+                    # venceu fora da janela: espera a janela abrir
+                    continue
+                self.run_job(job.name)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="onmauri-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.is_leader:
+            self._leader_lock.release()
+            self.is_leader = False
+
+    def stats(self) -> dict:
+        return {name: job.stats() for name, job in self.jobs.items()}
+
+
+scheduler = Scheduler()
@@ -0,0 +1,178 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from db.database import DATABASE_URL
+
+# =====================================
+# PIPELINE DE GRAVAÇÃO DE VENDAS (group commit)
+# =====================================
+# Modo opcional (ORDER_WRITE_PIPELINE=1). Em vez de cada checkout pagar
+# o próprio COMMIT + fsync, os pedidos entram numa fila e uma única
+# thread gravadora aplica lotes pequenos numa transação só, com um
+# SAVEPOINT por pedido: pedido com erro desfaz só o próprio savepoint e
+# o chamador recebe a exceção dele.
+#
+# Durabilidade: o chamador só recebe o resultado depois que o COMMIT do
+# lote retornou (mesmo PRAGMA synchronous do banco). Uma resposta de
+# sucesso significa venda gravada em disco; se o COMMIT do lote falhar,
+# todos os pedidos do lote recebem o erro e nada foi gravado.
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_ENABLED = os.getenv("ORDER_WRITE_PIPELINE", "0") == "1"
+MAX_BATCH = int(os.getenv("ORDER_PIPELINE_BATCH", "32"))
+MAX_WAIT_SECONDS = float(os.getenv("ORDER_PIPELINE_WAIT_MS", "2")) / 1000.0
+QUEUE_SIZE = 1000
+SUBMIT_TIMEOUT_SECONDS = 30.0
+
+
+class PipelineBusy(Exception):
+    pass
+
+
+# engine próprio: o pysqlite não emite BEGIN sozinho e quebra SAVEPOINT;
+# aqui a transação é controlada à mão (BEGIN IMMEDIATE pega o lock de
+# escrita logo no início do lote)
+pipeline_engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+)
+
+
+@event.listens_for(pipeline_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_conn, connection_record):
+    dbapi_conn.isolation_level = None
+
+
+@event.listens_for(pipeline_engine, "begin")
+def _begin_immediate(conn):
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+PipelineSession = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=pipeline_engine,
+)
+
+
+class WritePipeline:
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT_SECONDS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+
+        self.batches = 0
+        self.committed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, work: Callable[[Session], object], timeout: float = SUBMIT_TIMEOUT_SECONDS):
+        """Enfileira `work(db)` e espera o COMMIT do lote. Repassa a exceção do pedido."""
+        future: Future = Future()
+        try:
+            self._queue.put((work, future), timeout=timeout)
+        except queue.Full:
+            raise PipelineBusy("fila de gravação cheia")
+        # sem timeout aqui: a resposta só sai quando o resultado do lote é conhecido
+        return future.result()
+
+    def _next_batch(self) -> list | None:
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(0.0, remaining)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # parada: termina este lote e sai
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _apply(self, batch: list):
+        db = PipelineSession()
+        done = []  # (future, resultado)
+
+        try:
+            for work, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        result = work(db)
+                    done.append((future, result))
+                except Exception as e:
+                    self.failed += 1
+                    future.set_exception(e)
+
+            db.commit()
+
+        except Exception as e:
+            logger.exception("commit do lote de vendas falhou")
+            db.rollback()
+            for future, _ in done:
+                future.set_exception(e)
+            self.failed += len(done)
+            return
+
+        finally:
+            db.close()
+
+        self.batches += 1
+        self.committed += len(done)
+        for future, result in done:
+            future.set_result(result)
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._apply(batch)
+
+    def start(self):
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._loop, name="onmauri-order-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if not self.running:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.running,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "committed": self.committed,
+            "failed": self.failed,
+            "avg_batch": round(self.committed / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+order_pipeline = WritePipeline()
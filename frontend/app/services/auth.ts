@@ -1,4 +1,6 @@
 import {api} from "./api";
+import type { Product } from "./products";
+import type { Seller } from "./sellers";
 
 export type LoginResponse = {
   token: string;
@@ -37,4 +39,26 @@ export async function logout(): Promise<{ message: string }> {
   localStorage.removeItem("user_name");
 
   return { message: "Logout realizado" };
-}
\ No newline at end of file
+}
+
+export type BootstrapResponse = {
+  user: {
+    id: number;
+    name: string;
+    email: string;
+    role: string;
+    must_change_password: boolean;
+    // só para vendedora: o cadastro dela em /sellers
+    seller_id: number | null;
+  };
+  catalog_version: number;
+  products: Product[];
+  sellers: Seller[];
+  unread_notifications: number;
+};
+
+// abertura do PDV: perfil, catálogo, vendedoras e notificações numa chamada só
+export async function getBootstrap(): Promise<BootstrapResponse> {
+  const { data } = await api.get("/bootstrap");
+  return data;
+}
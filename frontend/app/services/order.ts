@@ -4,7 +4,9 @@ type OrderItemPayload = { product_id: number; quantity: number };
 
 export type CreateOrderPayload = {
   items: OrderItemPayload[];
-  seller: string;
+  seller_id?: number;
+  // compatibilidade: só o nome (o backend procura a vendedora pelo nome)
+  seller?: string;
   payment: string;
   discount_type: "none" |"money" | "percent";
   discount_value: number;
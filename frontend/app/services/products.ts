@@ -7,6 +7,8 @@ export interface Product {
   price: number;
   stock: number;
   active: boolean;
+  reserved?: number;
+  change_seq?: number;
 }
 
 export async function getProducts(): Promise<Product[]> {
@@ -14,6 +16,38 @@ export async function getProducts(): Promise<Product[]> {
   return response.data;
 }
 
+export type ProductChanges = {
+  version: number;
+  has_more: boolean;
+  changed: Product[];
+  deactivated: number[];
+};
+
+// sync incremental: só o que mudou depois de `since`
+export async function getProductChanges(since: number): Promise<ProductChanges> {
+  const response = await api.get("/products/changes", { params: { since } });
+  return response.data;
+}
+
+export type RelatedProduct = {
+  product_id: number;
+  name: string;
+  price: number;
+  orders: number;
+  confidence: number;
+  lift: number;
+};
+
+// "comprados juntos": sugestões de adicionais no PDV
+export async function getRelatedProducts(
+  id: number,
+  by: "confidence" | "lift" = "confidence",
+  limit = 5
+): Promise<RelatedProduct[]> {
+  const response = await api.get(`/products/${id}/related`, { params: { by, limit } });
+  return response.data;
+}
+
 export type ProductPayload = {
   name: string;
   description?: string | null;
@@ -12,7 +12,7 @@ export type ReportSummary = {
   orders_today: number;
 
   top_products: { product_id: number; name: string; qty: number; revenue: number }[];
-  top_sellers: { seller: string; orders: number; revenue: number }[];
+  top_sellers: { seller_id?: number | null; seller: string; orders: number; revenue: number }[];
 
   recent_orders: {
     id: number;
@@ -6,7 +6,8 @@ import Modal from "../components/modal";
 import { getProducts, Product } from "../services/products";
 import { SaleSuccessModal } from "../components/salesuccessmodal";
 import { createOrder } from "../services/order";
-import { getSellers, Seller } from "../services/sellers";
+import { Seller } from "../services/sellers";
+import { getBootstrap } from "../services/auth";
 
 type PaymentMethod = "pix" | "credito" | "debito" | "dinheiro";
 
@@ -35,18 +36,6 @@ function getRole(): "admin" | "gerente" | "seller" | "" {
   return "";
 }
 
-// ✅ Pega nome do usuário logado (pra seller não precisar selecionar)
-function getUserName(): string {
-  if (typeof window === "undefined") return "";
-  const raw =
-    localStorage.getItem("user_name") ||
-    localStorage.getItem("name") ||
-    localStorage.getItem("username") ||
-    localStorage.getItem("user") ||
-    "";
-  return raw.trim();
-}
-
 export default function VendasPage() {
   const [products, setProducts] = useState<Product[]>([]);
   const [loadingProducts, setLoadingProducts] = useState(false);
@@ -54,6 +43,10 @@ export default function VendasPage() {
   // sellers
   const [sellers, setSellers] = useState<Seller[]>([]);
   const [loadingSellers, setLoadingSellers] = useState(false);
+  // vendedora logada (role seller): vem do /bootstrap, ela não escolhe
+  const [ownSeller, setOwnSeller] = useState<{ id: number; name: string } | null>(
+    null
+  );
 
   // modal adicionar item
   const [openAdd, setOpenAdd] = useState(false);
@@ -64,7 +57,8 @@ export default function VendasPage() {
   const [cart, setCart] = useState<CartItem[]>([]);
 
   // venda
-  const [seller, setSeller] = useState("");
+  // vai por id: o backend não precisa procurar a vendedora pelo nome
+  const [sellerId, setSellerId] = useState<number | "">("");
   const [payment, setPayment] = useState<PaymentMethod>("pix");
   const [discountType, setDiscountType] = useState<"none" | "money" | "percent">(
     "none"
@@ -92,44 +86,32 @@ export default function VendasPage() {
     }
   }
 
-  // ✅ CHAMA /sellers APENAS PARA admin/gerente
-  async function loadSellers() {
-    const role = getRole();
-
-    // seller (ou role desconhecida) NÃO chama a API
-    if (role !== "admin" && role !== "gerente") {
-      setSellers([]);
-      setLoadingSellers(false);
-      return;
-    }
-
+  // ✅ abertura do PDV numa chamada só (/bootstrap)
+  // vendedoras só vêm preenchidas para admin/gerente
+  async function loadBootstrap() {
+    setLoadingProducts(true);
     setLoadingSellers(true);
     try {
-      const data = await getSellers();
-      setSellers(data);
-    } catch (err: any) {
-      const status = err?.response?.status;
-      if (status === 401 || status === 403) {
-        setError("Você não tem autoridade para acessar essa informação.");
-      } else {
-        setError("Erro ao carregar vendedoras.");
+      const data = await getBootstrap();
+      setProducts(data.products);
+      setSellers(data.sellers);
+
+      // ✅ se for seller, a vendedora já vem definida
+      if (data.user.seller_id) {
+        setOwnSeller({ id: data.user.seller_id, name: data.user.name });
+        setSellerId(data.user.seller_id);
       }
+    } catch {
+      setError("Erro ao carregar produtos e vendedoras.");
       setSellers([]);
     } finally {
+      setLoadingProducts(false);
       setLoadingSellers(false);
     }
   }
 
   useEffect(() => {
-    loadProducts();
-    loadSellers();
-
-    // ✅ se for seller, tenta setar automaticamente a vendedora
-    const role = getRole();
-    if (role === "seller") {
-      const name = getUserName();
-      if (name) setSeller(name);
-    }
+    loadBootstrap();
   }, []);
 
   const subtitle = useMemo(() => {
@@ -249,14 +231,8 @@ export default function VendasPage() {
 
   function clearSale() {
     setCart([]);
-    // se for seller, mantém o próprio nome
-    const role = getRole();
-    if (role === "seller") {
-      const name = getUserName();
-      setSeller(name || "");
-    } else {
-      setSeller("");
-    }
+    // se for seller, mantém ela mesma
+    setSellerId(ownSeller ? ownSeller.id : "");
     setPayment("pix");
     setDiscountType("none");
     setDiscountValue(0);
@@ -272,8 +248,8 @@ export default function VendasPage() {
       return;
     }
 
-    if (!seller) {
-      // se for seller e não tiver nome salvo, dá instrução clara
+    if (!sellerId) {
+      // se for seller e o cadastro dela não veio, dá instrução clara
       const role = getRole();
       if (role === "seller") {
         setError(
@@ -303,7 +279,7 @@ export default function VendasPage() {
 
       const payload: any = {
         items: itemsPayload,
-        seller,
+        seller_id: sellerId,
         payment,
         note: note.trim() ? note : null,
         discount_type: discountType,
@@ -437,8 +413,10 @@ export default function VendasPage() {
               </label>
 
               <select
-                value={seller}
-                onChange={(e) => setSeller(e.target.value)}
+                value={sellerId}
+                onChange={(e) =>
+                  setSellerId(e.target.value ? Number(e.target.value) : "")
+                }
                 disabled={role === "seller"} // ✅ seller não escolhe
                 className="mt-2 w-full rounded-xl border border-gray-200 px-3 py-2 outline-none focus:ring-2 focus:ring-black/10 disabled:opacity-60"
               >
@@ -450,9 +428,13 @@ export default function VendasPage() {
                     : "Selecione..."}
                 </option>
 
+                {role === "seller" && ownSeller && (
+                  <option value={ownSeller.id}>{ownSeller.name}</option>
+                )}
+
                 {role !== "seller" &&
                   sellers.map((s) => (
-                    <option key={s.id} value={s.name}>
+                    <option key={s.id} value={s.id}>
                       {s.name}
                     </option>
                   ))}
@@ -465,9 +447,9 @@ export default function VendasPage() {
                 </p>
               )}
 
-              {role === "seller" && !seller && (
+              {role === "seller" && !loadingSellers && !sellerId && (
                 <p className="mt-2 text-xs text-red-600">
-                  Não foi possível identificar seu nome. Saia e entre novamente.
+                  Não foi possível identificar seu cadastro de vendedora. Saia e entre novamente.
                 </p>
               )}
             </div>